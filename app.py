@@ -2,9 +2,32 @@ import os
 import logging
 import json
 import time
+import sys
+import secrets
+import threading
+import heapq
+import bisect
+from collections import OrderedDict, deque
 import numpy as np
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory
+from page_assets import GAME_PAGE_HTML, minify_css, minify_svg, page_source_digest
 import io
+import struct
+import tempfile
+import mmap
+import base64
+import binascii
+import decimal
+import gzip
+import hashlib
+import re
+import mimetypes
+import datetime
+import queue
+import atexit
+import signal
+import contextlib
+import fcntl
 
 # Configure environment for headless pygame
 os.environ['SDL_VIDEODRIVER'] = 'dummy'
@@ -51,7 +74,7 @@ if os.environ.get('ENVIRONMENT') != 'local':
             logger.info("CloudWatch logging configured")
         
         # Initialize DynamoDB client
-        dynamodb = boto3.resource('dynamodb')
+        dynamodb = boto3.resource('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT'))
         table_name = os.environ.get('DYNAMODB_TABLE', 'GameScores')
         table = dynamodb.Table(table_name)
         logger.info(f"DynamoDB table initialized: {table_name}")
@@ -63,9 +86,6 @@ else:
     logger.info("Running in local mode - AWS services disabled")
     use_dynamodb = False
 
-# Create a fallback in-memory storage for scores
-memory_scores = []
-
 try:
     # Import PIL separately to avoid conflicts
     from PIL import Image
@@ -114,14 +134,12 @@ if os.environ.get('ENVIRONMENT') == 'production':
 
 # Initialize DynamoDB client
 try:
-    dynamodb = boto3.resource('dynamodb')
+    dynamodb = boto3.resource('dynamodb', endpoint_url=os.environ.get('DYNAMODB_ENDPOINT'))
     table_name = os.environ.get('DYNAMODB_TABLE', 'GameScores')
     table = dynamodb.Table(table_name)
     logger.info(f"DynamoDB table initialized: {table_name}")
 except Exception as e:
     logger.error(f"Error initializing DynamoDB: {str(e)}")
-    # Create a fallback in-memory storage for scores
-    memory_scores = []
 
 # Game constants
 SCREEN_WIDTH = 800
@@ -130,72 +148,399 @@ PLAYER_SPEED = 5
 BULLET_SPEED = 10
 ENEMY_SPEED = 3
 MAX_ENEMIES = 10
+ENEMY_TYPES = ['ec2', 's3', 'lambda']
+HIT_RADIUS = 25
+CONTACT_RANGE = 30
+
+# Engine used for new game sessions: 'array' (NumPy) or 'list'
+GAME_ENGINE = os.environ.get('GAME_ENGINE', 'array')
+# Ticks of removal history kept for delta snapshots
+DELTA_HISTORY_TICKS = int(os.environ.get('DELTA_HISTORY_TICKS', 90))
+# Pending tick-stamped commands allowed per session
+MAX_QUEUED_INPUTS = int(os.environ.get('MAX_QUEUED_INPUTS', 256))
+# How far past the current tick a command may be scheduled
+MAX_INPUT_LEAD_TICKS = int(os.environ.get('MAX_INPUT_LEAD_TICKS', 300))
+INPUT_ACTIONS = ('left', 'right', 'shoot')
+
+def parse_input_command(command):
+    """Validate one {'tick': t, 'action': a} command; returns (tick or None, action).
+
+    Raises ValueError with a message fit for a 400 response.
+    """
+    if not isinstance(command, dict):
+        raise ValueError('each command must be an object')
+    action = command.get('action')
+    if action not in INPUT_ACTIONS:
+        raise ValueError(f"action must be one of {', '.join(INPUT_ACTIONS)}")
+    tick = command.get('tick')
+    if tick is None:
+        return None, action
+    if isinstance(tick, bool) or not isinstance(tick, (int, float, str)):
+        raise ValueError('tick must be a non-negative integer')
+    try:
+        number = decimal.Decimal(str(tick).strip())
+    except decimal.InvalidOperation:
+        raise ValueError('tick must be a non-negative integer')
+    if not number.is_finite() or number != number.to_integral_value() or number < 0:
+        raise ValueError('tick must be a non-negative integer')
+    return int(number), action
+
+# Cell keys pack (column, row) into one integer for the NumPy broadphase
+GRID_STRIDE = 1 << 20
+
+def collision_pairs(bullets, enemies, radius=HIT_RADIUS):
+    """Uniform-grid broadphase for Bullet/Enemy entities.
+
+    Cells are one hit radius wide, so any hit lies in the 3x3 block around a
+    bullet. Returns (bullet, enemy) index pairs within the radius, ordered
+    by bullet then enemy.
+    """
+    bullet_idx, enemy_idx = [], []
+    if not bullets or not enemies:
+        return bullet_idx, enemy_idx
+    cells = {}
+    for j, enemy in enumerate(enemies):
+        cells.setdefault((enemy.x // radius, enemy.y // radius), []).append(j)
+    limit = radius * radius
+    for i, bullet in enumerate(bullets):
+        bx, by = bullet.x, bullet.y
+        cx, cy = bx // radius, by // radius
+        found = []
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for j in cells.get((gx, gy), ()):
+                    dx = bx - enemies[j].x
+                    dy = by - enemies[j].y
+                    if dx * dx + dy * dy < limit:
+                        found.append(j)
+        if found:
+            found.sort()
+            bullet_idx.extend([i] * len(found))
+            enemy_idx.extend(found)
+    return bullet_idx, enemy_idx
+
+def grid_collision_pairs(bullet_x, bullet_y, enemy_x, enemy_y, radius=HIT_RADIUS):
+    """Vectorized uniform-grid broadphase for array-based entities.
+
+    Enemies are sorted by cell key and each bullet looks up the nine
+    neighbouring cells with searchsorted. Same output as collision_pairs().
+    """
+    nb, ne = len(bullet_x), len(enemy_x)
+    if nb == 0 or ne == 0:
+        return [], []
+    bx = bullet_x.astype(np.int64)
+    by = bullet_y.astype(np.int64)
+    ex = enemy_x.astype(np.int64)
+    ey = enemy_y.astype(np.int64)
+    enemy_keys = (ex // radius) * GRID_STRIDE + ey // radius
+    order = np.argsort(enemy_keys, kind='stable')
+    sorted_keys = enemy_keys[order]
+    bullet_keys = (bx // radius) * GRID_STRIDE + by // radius
+    bullet_parts, enemy_parts = [], []
+    for ox in (-1, 0, 1):
+        for oy in (-1, 0, 1):
+            keys = bullet_keys + (ox * GRID_STRIDE + oy)
+            lo = np.searchsorted(sorted_keys, keys, 'left')
+            counts = np.searchsorted(sorted_keys, keys, 'right') - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            # Expand each bullet's [lo, hi) range into individual candidates
+            b = np.repeat(np.arange(nb), counts)
+            offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            bullet_parts.append(b)
+            enemy_parts.append(order[lo[b] + offsets])
+    if not bullet_parts:
+        return [], []
+    b = np.concatenate(bullet_parts)
+    e = np.concatenate(enemy_parts)
+    dx = bx[b] - ex[e]
+    dy = by[b] - ey[e]
+    hit = dx * dx + dy * dy < radius * radius
+    b, e = b[hit], e[hit]
+    order = np.lexsort((e, b))
+    return b[order].tolist(), e[order].tolist()
+
+def resolve_hits(bullet_idx, enemy_idx):
+    """Pick the hits from candidate (bullet, enemy) pairs.
+
+    Pairs must be ordered by bullet then enemy. Each bullet takes the first
+    enemy still alive, matching the original nested loop.
+    """
+    dead_bullets = []
+    dead_enemies = set()
+    last_hit = -1
+    for b, e in zip(bullet_idx, enemy_idx):
+        if b == last_hit or e in dead_enemies:
+            continue
+        dead_bullets.append(b)
+        dead_enemies.add(e)
+        last_hit = b
+    return dead_bullets, dead_enemies
+
+class GameStateBase:
+    """Player input, batch stepping and delta snapshots shared by the game engines"""
+    def _init_tracking(self):
+        self.game_id = secrets.token_hex(4)
+        self.tick = 0
+        self.next_entity_id = 1
+        # (tick, next entity id after the tick, removed bullet ids, removed enemy ids)
+        self.tick_log = deque([(0, 1, (), ())], maxlen=DELTA_HISTORY_TICKS)
+        # Heap of (tick, sequence, action) drained by advance()
+        self.input_queue = []
+        self.input_sequence = 0
+        # Entity pool misses in the last advance(): entities or columns that had to be
+        # newly created. Other per-tick allocations (lists, NumPy temporaries) aren't counted.
+        self.tick_pool_misses = 0
+        # Bumped on every change clients can see; with game_id it makes the /game/status ETag
+        self.version = 0
+
+    def _new_entity_id(self):
+        entity_id = self.next_entity_id
+        self.next_entity_id += 1
+        return entity_id
+
+    def _record_tick(self, removed_bullets, removed_enemies):
+        self.tick_log.append((self.tick, self.next_entity_id,
+                              tuple(removed_bullets), tuple(removed_enemies)))
+
+    def snapshot(self, since=None, game_id=None):
+        """State with entity ids, as a delta against an earlier tick when possible.
+
+        Bullets and enemies only move along their fixed per-tick velocity, so
+        a delta lists entities added or removed after `since` and the client
+        advances the ones it already has by velocity * (tick - since). Falls
+        back to a full keyframe when `since` is outside the retained history
+        or belongs to another game.
+        """
+        first = self.tick_log[0][0]
+        keyframe = (since is None or since < first or since > self.tick or
+                    (game_id is not None and game_id != self.game_id))
+        snapshot = {
+            'game_id': self.game_id,
+            'tick': self.tick,
+            'keyframe': keyframe,
+            'player': {
+                'x': self.player_x,
+                'y': self.player_y,
+                'health': self.player_health
+            },
+            'score': self.score,
+            'level': self.level,
+            'game_over': self.game_over
+        }
+        if keyframe:
+            snapshot['velocity'] = {'bullet': [0, -BULLET_SPEED], 'enemy': [0, ENEMY_SPEED]}
+            snapshot['bullets'] = self.bullet_records()
+            snapshot['enemies'] = self.enemy_records()
+            return snapshot
+        # Clients ignore removals of ids they never saw
+        new_id = self.tick_log[since - first][1]
+        removed_bullets, removed_enemies = [], []
+        for entry in list(self.tick_log)[since - first + 1:]:
+            removed_bullets.extend(entry[2])
+            removed_enemies.extend(entry[3])
+        snapshot['since'] = since
+        snapshot['bullets'] = self.bullet_records(new_id)
+        snapshot['enemies'] = self.enemy_records(new_id)
+        snapshot['removed_bullets'] = removed_bullets
+        snapshot['removed_enemies'] = removed_enemies
+        return snapshot
+
+    def move(self, direction):
+        if direction == 'left' and self.player_x > 20:
+            self.player_x -= PLAYER_SPEED
+            self.version += 1
+        elif direction == 'right' and self.player_x < SCREEN_WIDTH - 20:
+            self.player_x += PLAYER_SPEED
+            self.version += 1
+
+    def shoot(self):
+        self.add_bullet(self.player_x, self.player_y)
+        self.version += 1
+
+    def apply_input(self, action):
+        if action == 'shoot':
+            self.shoot()
+        elif action in ('left', 'right'):
+            self.move(action)
+
+    def queue_inputs(self, commands):
+        """Queue tick-stamped commands for the engine to apply at tick time.
+
+        A command {'tick': t, 'action': a} is applied just before the update
+        that produces tick t. Commands without a tick, or for a tick that has
+        already run, go to the next update. Commands that don't fit in the
+        queue are dropped. Returns (accepted, dropped).
+
+        Raises ValueError, before queueing anything, for a malformed command
+        or one scheduled more than MAX_INPUT_LEAD_TICKS ahead, so far-future
+        commands can't hold queue slots indefinitely.
+        """
+        parsed = [parse_input_command(command) for command in commands]
+        horizon = self.tick + MAX_INPUT_LEAD_TICKS
+        if any(tick is not None and tick > horizon for tick, _ in parsed):
+            raise ValueError(f'tick must be at most {horizon} ({MAX_INPUT_LEAD_TICKS} ticks ahead)')
+        accepted = 0
+        for tick, action in parsed:
+            if len(self.input_queue) >= MAX_QUEUED_INPUTS:
+                break
+            tick = max(tick or 0, self.tick + 1)
+            heapq.heappush(self.input_queue, (tick, self.input_sequence, action))
+            self.input_sequence += 1
+            accepted += 1
+        return accepted, len(commands) - accepted
+
+    def drain_inputs(self):
+        """Apply queued commands due before the next update"""
+        while self.input_queue and self.input_queue[0][0] <= self.tick + 1:
+            self.apply_input(heapq.heappop(self.input_queue)[2])
+
+    def advance(self):
+        """Run one tick: apply due inputs, then update. A finished game stays frozen."""
+        if self.game_over:
+            # The scheduler and step() already stop here; polling without a tick thread didn't
+            self.tick_pool_misses = 0
+            return
+        pool_misses = self.pool_misses
+        self.version += 1
+        self.drain_inputs()
+        self.update()
+        self.tick_pool_misses = self.pool_misses - pool_misses
+
+    def step(self, n, inputs=None):
+        """Run up to n updates in a tight loop and return aggregated events.
+
+        inputs is a list of {'tick': offset, 'action': 'left'|'right'|'shoot'}
+        applied before the update at that offset. Stops early on game over.
+        Raises ValueError for a malformed command, or an offset outside the
+        n updates, before running any update.
+        """
+        schedule = {}
+        for command in inputs or []:
+            tick, action = parse_input_command(command)
+            if tick is not None and tick >= n:
+                raise ValueError(f'tick must be less than ticks ({n})')
+            schedule.setdefault(tick or 0, []).append(action)
+        kills, damage_taken, level = self.kills, self.damage_taken, self.level
+        ticks = 0
+        for tick in range(n):
+            if self.game_over:
+                break
+            for action in schedule.get(tick, ()):
+                self.apply_input(action)
+            self.advance()
+            ticks += 1
+        return {
+            'ticks': ticks,
+            'kills': self.kills - kills,
+            'damage_taken': self.damage_taken - damage_taken,
+            'level_ups': self.level - level,
+            'game_over': self.game_over
+        }
+
+class Bullet:
+    __slots__ = ('id', 'x', 'y')
+
+class Enemy:
+    __slots__ = ('id', 'x', 'y', 'type')
+
+class EntityPool:
+    """Free list of slotted entities so steady-state ticks allocate nothing"""
+    def __init__(self, factory):
+        self.factory = factory
+        self.free = []
+        self.allocated = 0
+
+    def acquire(self):
+        if self.free:
+            return self.free.pop()
+        self.allocated += 1
+        return self.factory()
+
+    def release(self, entity):
+        self.free.append(entity)
 
 # Game state (headless mode for server)
-class GameState:
+class GameState(GameStateBase):
     def __init__(self):
         self.player_x = SCREEN_WIDTH // 2
         self.player_y = SCREEN_HEIGHT - 50
         self.player_health = 100
         self.score = 0
-        self.bullets = []  # List of [x, y] positions
-        self.enemies = []  # List of [x, y, type] positions
+        self.bullets = []  # List of Bullet entities
+        self.enemies = []  # List of Enemy entities
+        self.bullet_pool = EntityPool(Bullet)
+        self.enemy_pool = EntityPool(Enemy)
         self.game_over = False
         self.level = 1
+        self.kills = 0
+        self.damage_taken = 0
+        self.lock = threading.Lock()
+        self._init_tracking()
         logger.info("New game state initialized")
+
+    @property
+    def pool_misses(self):
+        return self.bullet_pool.allocated + self.enemy_pool.allocated
         
     def update(self):
+        self.tick += 1
+        removed_bullets, removed_enemies = [], []
         try:
-            # Move bullets
-            new_bullets = []
+            # Move bullets, compacting the list in place
+            kept = 0
             for bullet in self.bullets:
-                bullet[1] -= BULLET_SPEED
-                if bullet[1] > 0:
-                    new_bullets.append(bullet)
-            self.bullets = new_bullets
+                bullet.y -= BULLET_SPEED
+                if bullet.y > 0:
+                    self.bullets[kept] = bullet
+                    kept += 1
+                else:
+                    removed_bullets.append(bullet.id)
+                    self.bullet_pool.release(bullet)
+            del self.bullets[kept:]
             
             # Move enemies
-            new_enemies = []
+            kept = 0
             for enemy in self.enemies:
-                enemy[1] += ENEMY_SPEED
+                enemy.y += ENEMY_SPEED
                 
                 # Check if enemy hit player
-                if (abs(enemy[0] - self.player_x) < 30 and 
-                    abs(enemy[1] - self.player_y) < 30):
+                if (abs(enemy.x - self.player_x) < CONTACT_RANGE and 
+                    abs(enemy.y - self.player_y) < CONTACT_RANGE):
                     self.player_health -= 10
+                    self.damage_taken += 10
                     if self.player_health <= 0:
                         self.game_over = True
                         logger.info(f"Game over. Final score: {self.score}")
+                    removed_enemies.append(enemy.id)
+                    self.enemy_pool.release(enemy)
                     continue
                     
                 # Check if enemy reached bottom
-                if enemy[1] < SCREEN_HEIGHT:
-                    new_enemies.append(enemy)
-            self.enemies = new_enemies
+                if enemy.y < SCREEN_HEIGHT:
+                    self.enemies[kept] = enemy
+                    kept += 1
+                else:
+                    removed_enemies.append(enemy.id)
+                    self.enemy_pool.release(enemy)
+            del self.enemies[kept:]
             
-            # Check bullet-enemy collisions with more generous hit detection
-            for bullet in self.bullets[:]:
-                for enemy in self.enemies[:]:
-                    # Use a more generous hit radius for better hit detection
-                    dx = bullet[0] - enemy[0]
-                    dy = bullet[1] - enemy[1]
-                    distance = (dx * dx + dy * dy) ** 0.5  # Square root for distance
-                    
-                    # Increased hit radius (25 pixels)
-                    if distance < 25:
-                        if bullet in self.bullets:
-                            self.bullets.remove(bullet)
-                        if enemy in self.enemies:
-                            self.enemies.remove(enemy)
-                        self.score += 10 * self.level
-                        break
+            # Check bullet-enemy collisions through the grid broadphase
+            dead_bullets, dead_enemies = resolve_hits(*collision_pairs(self.bullets, self.enemies))
+            if dead_bullets:
+                # Compact both lists once instead of removing hits one by one
+                self._remove(self.bullets, set(dead_bullets), removed_bullets, self.bullet_pool)
+                self._remove(self.enemies, dead_enemies, removed_enemies, self.enemy_pool)
+                self.score += 10 * self.level * len(dead_bullets)
+                self.kills += len(dead_bullets)
             
             # Spawn new enemies
             if len(self.enemies) < MAX_ENEMIES and np.random.random() < 0.05:
                 enemy_x = np.random.randint(50, SCREEN_WIDTH - 50)
                 enemy_y = 0
-                enemy_type = np.random.choice(['ec2', 's3', 'lambda'])
-                self.enemies.append([enemy_x, enemy_y, enemy_type])
+                enemy_type = np.random.choice(ENEMY_TYPES)
+                self.add_enemy(enemy_x, enemy_y, enemy_type)
                 
             # Level up
             if self.score > self.level * 500:
@@ -203,7 +548,225 @@ class GameState:
                 logger.info(f"Level up: {self.level}")
         except Exception as e:
             logger.error(f"Error in game state update: {str(e)}")
+        self._record_tick(removed_bullets, removed_enemies)
+
+    @staticmethod
+    def _remove(entities, dead, removed_ids, pool):
+        kept = 0
+        for i, entity in enumerate(entities):
+            if i in dead:
+                removed_ids.append(entity.id)
+                pool.release(entity)
+            else:
+                entities[kept] = entity
+                kept += 1
+        del entities[kept:]
             
+    def to_dict(self):
+        return {
+            'player': {
+                'x': self.player_x,
+                'y': self.player_y,
+                'health': self.player_health
+            },
+            'bullets': [[b.x, b.y] for b in self.bullets],
+            'enemies': [[e.x, e.y, e.type] for e in self.enemies],
+            'score': self.score,
+            'level': self.level,
+            'game_over': self.game_over
+        }
+
+    def bullet_records(self, min_id=0):
+        return [[b.id, b.x, b.y] for b in self.bullets if b.id >= min_id]
+
+    def enemy_records(self, min_id=0):
+        return [[e.id, e.x, e.y, e.type] for e in self.enemies if e.id >= min_id]
+
+    def add_bullet(self, x, y):
+        bullet = self.bullet_pool.acquire()
+        bullet.id = self._new_entity_id()
+        bullet.x = x
+        bullet.y = y
+        self.bullets.append(bullet)
+
+    def add_enemy(self, x, y, enemy_type):
+        enemy = self.enemy_pool.acquire()
+        enemy.id = self._new_entity_id()
+        enemy.x = x
+        enemy.y = y
+        enemy.type = enemy_type
+        self.enemies.append(enemy)
+
+    def resident_bytes(self):
+        entities = (len(self.bullets) + len(self.bullet_pool.free)) * sys.getsizeof(Bullet())
+        entities += (len(self.enemies) + len(self.enemy_pool.free)) * sys.getsizeof(Enemy())
+        return (sys.getsizeof(self) + sys.getsizeof(self.__dict__) + entities +
+                sys.getsizeof(self.bullets) + sys.getsizeof(self.enemies) +
+                sys.getsizeof(self.bullet_pool.free) + sys.getsizeof(self.enemy_pool.free) +
+                sys.getsizeof(self.tick_log))
+
+class ArrayGameState(GameStateBase):
+    """Struct-of-arrays game engine backed by preallocated NumPy columns.
+
+    Same rules and to_dict() output as GameState; live entities are kept
+    packed at the front of each column in spawn order.
+    """
+    def __init__(self, capacity=64):
+        self.player_x = SCREEN_WIDTH // 2
+        self.player_y = SCREEN_HEIGHT - 50
+        self.player_health = 100
+        self.score = 0
+        self.game_over = False
+        self.level = 1
+        self.kills = 0
+        self.damage_taken = 0
+        self.bullet_id = np.empty(capacity, dtype=np.int64)
+        self.bullet_x = np.empty(capacity, dtype=np.int32)
+        self.bullet_y = np.empty(capacity, dtype=np.int32)
+        self.bullet_count = 0
+        self.enemy_id = np.empty(capacity, dtype=np.int64)
+        self.enemy_x = np.empty(capacity, dtype=np.int32)
+        self.enemy_y = np.empty(capacity, dtype=np.int32)
+        self.enemy_type = np.empty(capacity, dtype=np.int8)
+        self.enemy_count = 0
+        self.pool_misses = 0  # Column reallocations
+        self.lock = threading.Lock()
+        self._init_tracking()
+        self._removed_bullets = []
+        self._removed_enemies = []
+        logger.info("New array game state initialized")
+
+    @property
+    def bullets(self):
+        n = self.bullet_count
+        return [[x, y] for x, y in zip(self.bullet_x[:n].tolist(), self.bullet_y[:n].tolist())]
+
+    @property
+    def enemies(self):
+        n = self.enemy_count
+        return [[x, y, ENEMY_TYPES[t]] for x, y, t in zip(
+            self.enemy_x[:n].tolist(), self.enemy_y[:n].tolist(), self.enemy_type[:n].tolist())]
+
+    def bullet_records(self, min_id=0):
+        n = self.bullet_count
+        keep = self.bullet_id[:n] >= min_id
+        return [[i, x, y] for i, x, y in zip(
+            self.bullet_id[:n][keep].tolist(), self.bullet_x[:n][keep].tolist(),
+            self.bullet_y[:n][keep].tolist())]
+
+    def enemy_records(self, min_id=0):
+        n = self.enemy_count
+        keep = self.enemy_id[:n] >= min_id
+        return [[i, x, y, ENEMY_TYPES[t]] for i, x, y, t in zip(
+            self.enemy_id[:n][keep].tolist(), self.enemy_x[:n][keep].tolist(),
+            self.enemy_y[:n][keep].tolist(), self.enemy_type[:n][keep].tolist())]
+
+    def _grow(self, names, count):
+        # Double the columns when they are full
+        for name in names:
+            column = getattr(self, name)
+            if count >= len(column):
+                grown = np.empty(max(2 * len(column), 16), dtype=column.dtype)
+                grown[:count] = column[:count]
+                setattr(self, name, grown)
+                self.pool_misses += 1
+
+    def add_bullet(self, x, y):
+        n = self.bullet_count
+        self._grow(('bullet_id', 'bullet_x', 'bullet_y'), n)
+        self.bullet_id[n] = self._new_entity_id()
+        self.bullet_x[n] = x
+        self.bullet_y[n] = y
+        self.bullet_count = n + 1
+
+    def add_enemy(self, x, y, enemy_type):
+        n = self.enemy_count
+        self._grow(('enemy_id', 'enemy_x', 'enemy_y', 'enemy_type'), n)
+        self.enemy_id[n] = self._new_entity_id()
+        self.enemy_x[n] = x
+        self.enemy_y[n] = y
+        self.enemy_type[n] = ENEMY_TYPES.index(enemy_type)
+        self.enemy_count = n + 1
+
+    def _compact_bullets(self, keep):
+        n = self.bullet_count
+        k = int(np.count_nonzero(keep))
+        if k != n:
+            self._removed_bullets.extend(self.bullet_id[:n][~keep].tolist())
+            self.bullet_id[:k] = self.bullet_id[:n][keep]
+            self.bullet_x[:k] = self.bullet_x[:n][keep]
+            self.bullet_y[:k] = self.bullet_y[:n][keep]
+            self.bullet_count = k
+
+    def _compact_enemies(self, keep):
+        n = self.enemy_count
+        k = int(np.count_nonzero(keep))
+        if k != n:
+            self._removed_enemies.extend(self.enemy_id[:n][~keep].tolist())
+            self.enemy_id[:k] = self.enemy_id[:n][keep]
+            self.enemy_x[:k] = self.enemy_x[:n][keep]
+            self.enemy_y[:k] = self.enemy_y[:n][keep]
+            self.enemy_type[:k] = self.enemy_type[:n][keep]
+            self.enemy_count = k
+
+    def update(self):
+        self.tick += 1
+        self._removed_bullets, self._removed_enemies = [], []
+        try:
+            # Move bullets
+            nb = self.bullet_count
+            self.bullet_y[:nb] -= BULLET_SPEED
+            self._compact_bullets(self.bullet_y[:nb] > 0)
+
+            # Move enemies
+            ne = self.enemy_count
+            ex = self.enemy_x[:ne]
+            ey = self.enemy_y[:ne]
+            ey += ENEMY_SPEED
+
+            # Check if enemies hit player
+            contact = ((np.abs(ex - self.player_x) < CONTACT_RANGE) &
+                       (np.abs(ey - self.player_y) < CONTACT_RANGE))
+            contacts = int(np.count_nonzero(contact))
+            if contacts:
+                self.player_health -= 10 * contacts
+                self.damage_taken += 10 * contacts
+                if self.player_health <= 0:
+                    self.game_over = True
+                    logger.info(f"Game over. Final score: {self.score}")
+
+            # Drop enemies that hit the player or reached the bottom
+            self._compact_enemies(~contact & (ey < SCREEN_HEIGHT))
+
+            # Check bullet-enemy collisions
+            nb, ne = self.bullet_count, self.enemy_count
+            dead_bullets, dead_enemies = resolve_hits(*grid_collision_pairs(
+                self.bullet_x[:nb], self.bullet_y[:nb], self.enemy_x[:ne], self.enemy_y[:ne]))
+            if dead_bullets:
+                keep = np.ones(self.bullet_count, dtype=bool)
+                keep[dead_bullets] = False
+                self._compact_bullets(keep)
+                keep = np.ones(self.enemy_count, dtype=bool)
+                keep[list(dead_enemies)] = False
+                self._compact_enemies(keep)
+                self.score += 10 * self.level * len(dead_bullets)
+                self.kills += len(dead_bullets)
+
+            # Spawn new enemies
+            if self.enemy_count < MAX_ENEMIES and np.random.random() < 0.05:
+                enemy_x = np.random.randint(50, SCREEN_WIDTH - 50)
+                enemy_y = 0
+                enemy_type = np.random.choice(ENEMY_TYPES)
+                self.add_enemy(enemy_x, enemy_y, enemy_type)
+
+            # Level up
+            if self.score > self.level * 500:
+                self.level += 1
+                logger.info(f"Level up: {self.level}")
+        except Exception as e:
+            logger.error(f"Error in game state update: {str(e)}")
+        self._record_tick(self._removed_bullets, self._removed_enemies)
+
     def to_dict(self):
         return {
             'player': {
@@ -218,14 +781,136 @@ class GameState:
             'game_over': self.game_over
         }
 
-# Create a global game state
+    def resident_bytes(self):
+        return (sys.getsizeof(self) + sys.getsizeof(self.__dict__) +
+                sys.getsizeof(self.tick_log) +
+                self.bullet_id.nbytes + self.bullet_x.nbytes + self.bullet_y.nbytes +
+                self.enemy_id.nbytes + self.enemy_x.nbytes + self.enemy_y.nbytes +
+                self.enemy_type.nbytes)
+
+GAME_ENGINES = {
+    'list': GameState,
+    'array': ArrayGameState
+}
+
+# Session registry limits
+MAX_GAME_SESSIONS = int(os.environ.get('MAX_GAME_SESSIONS', 5000))
+GAME_SESSION_TTL = int(os.environ.get('GAME_SESSION_TTL', 900))  # seconds of inactivity
+SESSION_COOKIE = 'game_session'
+SESSION_HEADER = 'X-Game-Session'
+
+class GameRegistry:
+    """Per-session game states keyed by session token with LRU + TTL eviction"""
+    def __init__(self, factory, max_sessions=MAX_GAME_SESSIONS, ttl=GAME_SESSION_TTL):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._games = OrderedDict()  # token -> [state, last_access], oldest first
+        self._lock = threading.Lock()
+        self.created = 0
+        self.evicted_idle = 0
+        self.evicted_lru = 0
+
+    def _expire(self, now):
+        # Entries are kept in access order so only the stale head needs checking
+        while self._games:
+            token, entry = next(iter(self._games.items()))
+            if now - entry[1] < self.ttl:
+                break
+            del self._games[token]
+            self.evicted_idle += 1
+
+    def create(self, replaces=None):
+        """Start a fresh game under a newly minted token.
+
+        Tokens are never taken from the client, so a session id can't be
+        planted in a victim's browser. The caller's previous game, if any,
+        is dropped.
+        """
+        state = self.factory()
+        now = time.time()
+        token = secrets.token_urlsafe(16)
+        with self._lock:
+            self._expire(now)
+            if replaces:
+                self._games.pop(replaces, None)
+            self._games[token] = [state, now]
+            self._games.move_to_end(token)
+            self.created += 1
+            while len(self._games) > self.max_sessions:
+                self._games.popitem(last=False)
+                self.evicted_lru += 1
+        return token, state
+
+    def get(self, token):
+        """Return the game state for a token, or None if unknown or expired"""
+        if not token:
+            return None
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            entry = self._games.get(token)
+            if entry is None:
+                return None
+            entry[1] = now
+            self._games.move_to_end(token)
+            return entry[0]
+
+    def peek(self, token):
+        """Like get, but doesn't count as activity, so it never extends the session"""
+        if not token:
+            return None
+        with self._lock:
+            entry = self._games.get(token)
+            if entry is None or time.time() - entry[1] >= self.ttl:
+                return None
+            return entry[0]
+
+    def remove(self, token):
+        with self._lock:
+            return self._games.pop(token, None) is not None
+
+    def items(self):
+        """Snapshot of (token, state) pairs for background work"""
+        with self._lock:
+            return [(token, entry[0]) for token, entry in self._games.items()]
+
+    def stats(self):
+        with self._lock:
+            self._expire(time.time())
+            states = [entry[0] for entry in self._games.values()]
+            return {
+                'active': len(states),
+                'created': self.created,
+                'evicted_idle': self.evicted_idle,
+                'evicted_lru': self.evicted_lru,
+                'evicted': self.evicted_idle + self.evicted_lru,
+                'max_sessions': self.max_sessions,
+                'ttl_seconds': self.ttl,
+                'resident_bytes': sum(estimate_state_bytes(s) for s in states)
+            }
+
+def estimate_state_bytes(state):
+    """Approximate memory held by one game state"""
+    if hasattr(state, 'resident_bytes'):
+        return state.resident_bytes()
+    size = sys.getsizeof(state) + sys.getsizeof(state.__dict__)
+    for bullet in state.bullets:
+        size += sys.getsizeof(bullet)
+    for enemy in state.enemies:
+        size += sys.getsizeof(enemy)
+    size += sys.getsizeof(state.bullet_ids) + sys.getsizeof(state.enemy_ids)
+    return size + sys.getsizeof(state.bullets) + sys.getsizeof(state.enemies) + sys.getsizeof(state.tick_log)
+
+# Pick the game state implementation for new sessions
 try:
-    game_state = GameState()
-    logger.info("Global game state created successfully")
+    game_state_factory = GAME_ENGINES.get(GAME_ENGINE, ArrayGameState)
+    game_state_factory()
+    logger.info("Game state engine initialized successfully")
 except Exception as e:
     logger.error(f"Error creating game state: {str(e)}")
     # Create a simplified game state if GameState fails
-    class SimpleGameState:
+    class SimpleGameState(GameStateBase):
         def __init__(self):
             self.player_x = SCREEN_WIDTH // 2
             self.player_y = SCREEN_HEIGHT - 50
@@ -233,11 +918,28 @@ except Exception as e:
             self.score = 0
             self.bullets = []
             self.enemies = []
+            self.bullet_ids = []
+            self.enemy_ids = []
             self.game_over = False
             self.level = 1
+            self.kills = 0
+            self.damage_taken = 0
+            self.pool_misses = 0
+            self.lock = threading.Lock()
+            self._init_tracking()
             
         def update(self):
             pass
+
+        def add_bullet(self, x, y):
+            self.bullets.append([x, y])
+            self.bullet_ids.append(self._new_entity_id())
+
+        def bullet_records(self, min_id=0):
+            return [[i, b[0], b[1]] for i, b in zip(self.bullet_ids, self.bullets) if i >= min_id]
+
+        def enemy_records(self, min_id=0):
+            return []
             
         def to_dict(self):
             return {
@@ -253,12 +955,441 @@ except Exception as e:
                 'game_over': self.game_over
             }
     
-    game_state = SimpleGameState()
+    game_state_factory = SimpleGameState
     logger.info("Simplified game state created as fallback")
 
+logger.info(f"Game engine: {game_state_factory.__name__}")
+
+game_registry = GameRegistry(game_state_factory)
+
+# Server tick loop settings; a tick rate of 0 advances games on each status poll instead
+GAME_TICK_RATE = float(os.environ.get('GAME_TICK_RATE', 30))
+MAX_CATCHUP_TICKS = int(os.environ.get('MAX_CATCHUP_TICKS', 5))
+# A step holds the session lock, which the tick loop also needs, so keep it to a
+# few milliseconds of work; longer replays are sent as several steps
+MAX_STEP_TICKS = int(os.environ.get('MAX_STEP_TICKS', 300))
+# Under the gevent worker the tick loop is a greenlet; yield to request handlers
+# every this many sessions so a long tick doesn't stall them (0 never yields)
+TICK_YIELD_SESSIONS = int(os.environ.get('TICK_YIELD_SESSIONS', 64))
+
+class TickScheduler:
+    """Background fixed-timestep loop that advances every active session"""
+    def __init__(self, registry, rate=GAME_TICK_RATE, max_catchup=MAX_CATCHUP_TICKS):
+        self.registry = registry
+        self.rate = rate
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self.max_catchup = max_catchup
+        self._stop = threading.Event()
+        self._thread = None
+        self._tick_done = threading.Condition()
+        self.ticks = 0
+        self.dropped_ticks = 0
+        self.overruns = 0
+        self.sessions_last_tick = 0
+        self.pool_misses_last_tick = 0
+        self.pool_misses_total = 0
+        self.last_tick_ms = 0.0
+        self.max_tick_ms = 0.0
+        self.total_tick_ms = 0.0
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.rate <= 0 or self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='game-tick', daemon=True)
+        self._thread.start()
+        logger.info(f"Game tick loop started at {self.rate} Hz")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            now = time.perf_counter()
+            if now < next_tick:
+                self._stop.wait(next_tick - now)
+                continue
+            # Catch up on missed ticks, but never more than max_catchup at once
+            due = int((now - next_tick) / self.interval) + 1
+            if due > self.max_catchup:
+                self.dropped_ticks += due - self.max_catchup
+            for _ in range(min(due, self.max_catchup)):
+                self.tick()
+            next_tick += due * self.interval
+
+    def tick(self):
+        """Advance every running session by one tick"""
+        start = time.perf_counter()
+        sessions = 0
+        pool_misses = 0
+        for _, state in self.registry.items():
+            if state.game_over:
+                continue
+            with state.lock:
+                state.advance()
+            pool_misses += state.tick_pool_misses
+            sessions += 1
+            if TICK_YIELD_SESSIONS and sessions % TICK_YIELD_SESSIONS == 0:
+                time.sleep(0)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.ticks += 1
+        self.sessions_last_tick = sessions
+        self.pool_misses_last_tick = pool_misses
+        self.pool_misses_total += pool_misses
+        self.last_tick_ms = elapsed
+        self.max_tick_ms = max(self.max_tick_ms, elapsed)
+        self.total_tick_ms += elapsed
+        if self.interval and elapsed > self.interval * 1000:
+            self.overruns += 1
+        with self._tick_done:
+            self._tick_done.notify_all()
+
+    def wait_for_tick(self, last_seen, timeout):
+        """Block until a tick after last_seen has run; returns the latest tick count"""
+        with self._tick_done:
+            self._tick_done.wait_for(lambda: self.ticks != last_seen, timeout)
+            return self.ticks
+
+    def stats(self):
+        return {
+            'running': self.running,
+            'rate_hz': self.rate,
+            'budget_ms': round(self.interval * 1000, 3),
+            'ticks': self.ticks,
+            'dropped_ticks': self.dropped_ticks,
+            'overruns': self.overruns,
+            'sessions_last_tick': self.sessions_last_tick,
+            'pool_misses_last_tick': self.pool_misses_last_tick,
+            'pool_misses_total': self.pool_misses_total,
+            'last_tick_ms': round(self.last_tick_ms, 3),
+            'mean_tick_ms': round(self.total_tick_ms / self.ticks, 3) if self.ticks else 0.0,
+            'max_tick_ms': round(self.max_tick_ms, 3)
+        }
+
+tick_scheduler = TickScheduler(game_registry)
+tick_scheduler.start()
+
+def session_token():
+    """Session token sent by the client as a cookie or header"""
+    return request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+
+def current_game():
+    """Game state for the requesting session, or None"""
+    return game_registry.get(session_token())
+
+def unknown_session():
+    return jsonify({'error': 'Unknown or expired game session'}), 404
+
+# Binary wire format for game state, chosen with "Accept: application/vnd.cloud-defender.state".
+# Little-endian header: magic "CD", version, flags, tick, player x/y/health, level, score,
+# bullet count, enemy count. Optional sections follow in flag order, then the entity records.
+STATE_MIMETYPE = 'application/vnd.cloud-defender.state'
+WIRE_VERSION = 1
+WIRE_GAME_OVER = 1
+WIRE_IDS = 2        # records carry entity ids; game id (u32) follows the header
+WIRE_KEYFRAME = 4   # bullet and enemy velocities (4 x i16) follow
+WIRE_DELTA = 8      # since tick, removed bullet count, removed enemy count (3 x u32) follow
+WIRE_HEADER = struct.Struct('<2sBBIhhhHIII')
+WIRE_BULLET = np.dtype([('x', '<i2'), ('y', '<i2')])
+WIRE_BULLET_ID = np.dtype([('id', '<u4'), ('x', '<i2'), ('y', '<i2')])
+WIRE_ENEMY = np.dtype([('x', '<i2'), ('y', '<i2'), ('type', 'u1')])
+WIRE_ENEMY_ID = np.dtype([('id', '<u4'), ('x', '<i2'), ('y', '<i2'), ('type', 'u1')])
+ENEMY_TYPE_CODES = {name: code for code, name in enumerate(ENEMY_TYPES)}
+
+def pack_records(records, dtype):
+    """Pack [id,] x, y[, type] rows into fixed-width records"""
+    packed = np.zeros(len(records), dtype=dtype)
+    if records:
+        columns = list(zip(*records))
+        names = dtype.names
+        if names[-1] == 'type':
+            packed['type'] = [ENEMY_TYPE_CODES[t] for t in columns[-1]]
+        for name, column in zip(names, columns):
+            if name != 'type':
+                packed[name] = column
+    return packed.tobytes()
+
+def encode_state(payload, tick=0):
+    """Pack a to_dict() or snapshot() payload into the binary wire format"""
+    has_ids = 'game_id' in payload
+    keyframe = payload.get('keyframe', False)
+    delta = has_ids and not keyframe
+    flags = ((WIRE_GAME_OVER if payload['game_over'] else 0) | (WIRE_IDS if has_ids else 0) |
+             (WIRE_KEYFRAME if keyframe else 0) | (WIRE_DELTA if delta else 0))
+    player = payload['player']
+    bullets = payload['bullets']
+    enemies = payload['enemies']
+    parts = [WIRE_HEADER.pack(b'CD', WIRE_VERSION, flags, payload.get('tick', tick),
+                              player['x'], player['y'], player['health'],
+                              payload['level'], payload['score'], len(bullets), len(enemies))]
+    if has_ids:
+        parts.append(struct.pack('<I', int(payload['game_id'], 16)))
+    if keyframe:
+        velocity = payload['velocity']
+        parts.append(struct.pack('<4h', *velocity['bullet'], *velocity['enemy']))
+    if delta:
+        parts.append(struct.pack('<III', payload['since'], len(payload['removed_bullets']),
+                                 len(payload['removed_enemies'])))
+    parts.append(pack_records(bullets, WIRE_BULLET_ID if has_ids else WIRE_BULLET))
+    parts.append(pack_records(enemies, WIRE_ENEMY_ID if has_ids else WIRE_ENEMY))
+    if delta:
+        parts.append(np.asarray(payload['removed_bullets'], dtype='<u4').tobytes())
+        parts.append(np.asarray(payload['removed_enemies'], dtype='<u4').tobytes())
+    return b''.join(parts)
+
+def unpack_records(data, offset, count, dtype, enemy):
+    records = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+    rows = [list(row) for row in records.tolist()]
+    if enemy:
+        for row in rows:
+            row[-1] = ENEMY_TYPES[row[-1]]
+    return rows, offset + count * dtype.itemsize
+
+def decode_state(data):
+    """Unpack the binary wire format back into a to_dict() or snapshot() payload"""
+    (magic, version, flags, tick, x, y, health, level, score,
+     bullet_count, enemy_count) = WIRE_HEADER.unpack_from(data)
+    if magic != b'CD' or version != WIRE_VERSION:
+        raise ValueError('Not a game state payload')
+    payload = {
+        'tick': tick,
+        'player': {'x': x, 'y': y, 'health': health},
+        'level': level,
+        'score': score,
+        'game_over': bool(flags & WIRE_GAME_OVER)
+    }
+    offset = WIRE_HEADER.size
+    has_ids = bool(flags & WIRE_IDS)
+    if has_ids:
+        payload['game_id'] = f"{struct.unpack_from('<I', data, offset)[0]:08x}"
+        offset += 4
+    if flags & WIRE_KEYFRAME:
+        velocity = struct.unpack_from('<4h', data, offset)
+        payload['keyframe'] = True
+        payload['velocity'] = {'bullet': list(velocity[:2]), 'enemy': list(velocity[2:])}
+        offset += 8
+    removed = (0, 0)
+    if flags & WIRE_DELTA:
+        payload['keyframe'] = False
+        payload['since'], *removed = struct.unpack_from('<III', data, offset)
+        offset += 12
+    payload['bullets'], offset = unpack_records(data, offset, bullet_count,
+                                                WIRE_BULLET_ID if has_ids else WIRE_BULLET, False)
+    payload['enemies'], offset = unpack_records(data, offset, enemy_count,
+                                                WIRE_ENEMY_ID if has_ids else WIRE_ENEMY, True)
+    if flags & WIRE_DELTA:
+        payload['removed_bullets'] = np.frombuffer(data, '<u4', removed[0], offset).tolist()
+        offset += removed[0] * 4
+        payload['removed_enemies'] = np.frombuffer(data, '<u4', removed[1], offset).tolist()
+    return payload
+
+def wants_binary():
+    return request.accept_mimetypes.best_match(['application/json', STATE_MIMETYPE]) == STATE_MIMETYPE
+
+# Push channel settings; a client disconnects after this long without a session
+STREAM_IDLE_TIMEOUT = float(os.environ.get('STREAM_IDLE_TIMEOUT', 30))
+# Seconds between checks that a streamed session still exists
+STREAM_SESSION_CHECK_INTERVAL = float(os.environ.get('STREAM_SESSION_CHECK_INTERVAL', 1.0))
+# Seconds of silence before an SSE stream sends a keepalive comment
+STREAM_KEEPALIVE_INTERVAL = float(os.environ.get('STREAM_KEEPALIVE_INTERVAL', 15))
+
+# WebSocket support is optional; without flask-sock only the SSE stream is available
+try:
+    from flask_sock import Sock
+    sock = Sock(app)
+    logger.info("WebSocket support enabled")
+except Exception as e:
+    logger.error(f"Error initializing WebSocket support: {str(e)}")
+    sock = None
+
+class StreamStats:
+    """Counters for open push connections"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.opened = 0
+        self.messages = 0
+
+    def connect(self):
+        with self._lock:
+            self.open += 1
+            self.opened += 1
+
+    def disconnect(self):
+        with self._lock:
+            self.open -= 1
+
+    def sent(self):
+        with self._lock:
+            self.messages += 1
+
+    def stats(self):
+        with self._lock:
+            return {'open': self.open, 'opened': self.opened, 'messages': self.messages}
+
+stream_stats = StreamStats()
+
+def game_updates(token, since=None, game_id=None):
+    """Yield delta snapshots for a session as the tick loop advances it.
+
+    Wakes once per server tick and yields None on ticks where the game did
+    not change. The session is looked up in the registry only every
+    STREAM_SESSION_CHECK_INTERVAL seconds, without refreshing it, so an open
+    stream neither keeps an abandoned session alive nor takes the registry
+    lock every tick. Ends when the session has been gone for
+    STREAM_IDLE_TIMEOUT seconds.
+    """
+    last_tick = -1
+    state = game_registry.peek(token)
+    checked = time.monotonic()
+    idle_since = None
+    while True:
+        if tick_scheduler.running:
+            last_tick = tick_scheduler.wait_for_tick(last_tick, STREAM_IDLE_TIMEOUT)
+        else:
+            time.sleep(1.0 / 30)
+        now = time.monotonic()
+        if now - checked >= STREAM_SESSION_CHECK_INTERVAL:
+            state = game_registry.peek(token)
+            checked = now
+        if state is None:
+            idle_since = idle_since or now
+            if now - idle_since > STREAM_IDLE_TIMEOUT:
+                return
+            yield None
+            continue
+        idle_since = None
+        with state.lock:
+            if state.game_id == game_id and state.tick == since:
+                snapshot = None
+            else:
+                snapshot = state.snapshot(since, game_id)
+                since, game_id = state.tick, state.game_id
+        yield snapshot
+
+def state_response(payload, tick=0):
+    """Game state as JSON, or packed binary when the client asks for it"""
+    if wants_binary():
+        return Response(encode_state(payload, tick), mimetype=STATE_MIMETYPE)
+    return jsonify(payload)
+
+class ConditionalStats:
+    """If-None-Match counters per endpoint"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+
+    def record(self, name, conditional, not_modified):
+        with self._lock:
+            counters = self.counters.setdefault(name, {'requests': 0, 'conditional': 0, 'not_modified': 0})
+            counters['requests'] += 1
+            counters['conditional'] += conditional
+            counters['not_modified'] += not_modified
+
+    def stats(self, name):
+        counters = dict(self.counters.get(name, {'requests': 0, 'conditional': 0, 'not_modified': 0}))
+        counters['hit_rate'] = (round(counters['not_modified'] / counters['conditional'], 4)
+                                if counters['conditional'] else 0.0)
+        return counters
+
+conditional_stats = ConditionalStats()
+
+# Brotli is optional; without it precompressed bodies are served with gzip only
+try:
+    import brotli
+    logger.info("Brotli compression enabled")
+except Exception as e:
+    logger.error(f"Error importing brotli: {str(e)}")
+    brotli = None
+
+def not_modified(name, tag, last_modified=None):
+    """A 304 response if the request's validators match, else None.
+
+    If-None-Match is compared with the strong ETag `tag`; only when it is
+    absent is If-Modified-Since compared with `last_modified`.
+    """
+    if request.if_none_match:
+        conditional = True
+        hit = tag is not None and request.if_none_match.contains(tag)
+    else:
+        since = request.if_modified_since
+        conditional = since is not None
+        hit = conditional and last_modified is not None and last_modified <= since
+    conditional_stats.record(name, conditional, hit)
+    if not hit:
+        return None
+    response = Response(status=304)
+    response.set_etag(tag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+class PrecompressedBody:
+    """A static response body stored with its gzip and brotli encodings.
+
+    Encodings are compressed once, at maximum level, and kept only when
+    smaller than the original. Serving picks the best encoding the client
+    accepts, preferring brotli on equal quality, and answers If-None-Match
+    with 304. Each encoding has its own strong ETag derived from the content.
+    """
+    def __init__(self, body, mimetype, cache_control=None, last_modified=None):
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.last_modified = last_modified
+        self.digest = hashlib.sha256(body).hexdigest()[:20]
+        self.variants = {'identity': (body, self.digest)}
+        encoded = {'gzip': gzip.compress(body, 9, mtime=0)}
+        if brotli is not None:
+            encoded['br'] = brotli.compress(body, quality=11)
+        for encoding, data in encoded.items():
+            if len(data) < len(body):
+                self.variants[encoding] = (data, f"{self.digest}-{encoding}")
+
+    def encoding(self):
+        accepted = request.accept_encodings
+        best, quality = 'identity', 0
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accepted[encoding] > quality:
+                best, quality = encoding, accepted[encoding]
+        return best
+
+    def response(self, stats_name):
+        encoding = self.encoding()
+        body, tag = self.variants[encoding]
+        response = not_modified(stats_name, tag, self.last_modified)
+        if response is None:
+            response = Response(body, mimetype=self.mimetype)
+            response.set_etag(tag)
+            if self.last_modified is not None:
+                response.last_modified = self.last_modified
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        if self.cache_control:
+            response.headers['Cache-Control'] = self.cache_control
+        return response
+
+    def sizes(self):
+        return {encoding: len(body) for encoding, (body, _) in self.variants.items()}
+
+    @property
+    def body(self):
+        return self.variants['identity'][0]
+
 @app.route('/assets/<path:filename>')
 def serve_asset(filename):
-    """Serve assets"""
+    """Serve assets from the in-memory asset cache, or from disk if not cached"""
+    asset = asset_cache.get(filename)
+    if asset is not None:
+        return asset.response('assets')
     return send_from_directory('assets', filename)
 
 @app.route('/health', methods=['GET'])
@@ -267,243 +1398,167 @@ def health_check():
     logger.info("Health check requested")
     return jsonify({'status': 'healthy'}), 200
 
+# Static bundles: the page's inline CSS and JS, extracted by build_assets.py into
+# content-hashed files under assets/dist that browsers can cache indefinitely
+PAGE_BUILD_DIR = os.path.join(app.root_path, 'assets', 'dist')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+def load_built_page():
+    """The built HTML shell, if build_assets.py ran against the current GAME_PAGE_HTML"""
+    try:
+        with open(os.path.join(PAGE_BUILD_DIR, 'manifest.json')) as f:
+            manifest = json.load(f)
+        if manifest.get('source') != page_source_digest():
+            logger.info("Built page assets are out of date; serving the inline page")
+            return None
+        with open(os.path.join(PAGE_BUILD_DIR, manifest['page']), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(f"Error loading built page assets: {str(e)}")
+        return None
+
+game_page = PrecompressedBody(load_built_page() or GAME_PAGE_HTML.encode('utf-8'), 'text/html',
+                              cache_control='no-cache')
+
+# In-memory copies of everything under assets/, minified and precompressed at startup
+ASSET_DIR = os.path.join(app.root_path, 'assets')
+ASSET_MAX_AGE = int(os.environ.get('ASSET_MAX_AGE', 86400))  # seconds, for unfingerprinted files
+ASSET_DEV_MODE = os.environ.get('ASSET_DEV_MODE', 'false').lower() == 'true'
+ASSET_WATCH_INTERVAL = float(os.environ.get('ASSET_WATCH_INTERVAL', 1.0))  # seconds
+
+# JavaScript is served as written; gzip and brotli do most of what a minifier would
+ASSET_MINIFIERS = {'.css': minify_css, '.svg': minify_svg}
+FINGERPRINT_PATTERN = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+
+class AssetCache:
+    """Immutable map of asset path -> PrecompressedBody, built from ASSET_DIR.
+
+    SVG and CSS files are minified before compression; fingerprinted
+    bundles under dist/ are built by build_assets.py and are cached for a
+    year as immutable, everything else for ASSET_MAX_AGE. A reload builds a new map
+    and swaps it in, so readers never see a partly built one. In development
+    mode a thread polls file modification times and reloads on any change.
+    """
+    def __init__(self, directory=ASSET_DIR, watch=ASSET_DEV_MODE, interval=ASSET_WATCH_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self.assets = {}
+        self.mtimes = {}
+        self.source_bytes = {}
+        self.reloads = 0
+        self.load()
+        if watch:
+            threading.Thread(target=self._watch, name='asset-watcher', daemon=True).start()
+            logger.info(f"Watching {directory} for asset changes")
+
+    def _scan(self):
+        mtimes = {}
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                mtimes[os.path.relpath(path, self.directory).replace(os.sep, '/')] = os.stat(path).st_mtime
+        return mtimes
+
+    def _build(self, name, mtime):
+        with open(os.path.join(self.directory, name), 'rb') as f:
+            body = f.read()
+        self.source_bytes[name] = len(body)
+        extension = os.path.splitext(name)[1].lower()
+        fingerprinted = name.startswith('dist/') and FINGERPRINT_PATTERN.search(name) is not None
+        if extension in ASSET_MINIFIERS and not fingerprinted:
+            try:
+                minified = ASSET_MINIFIERS[extension](body.decode('utf-8')).encode('utf-8')
+                body = minified if len(minified) < len(body) else body
+            except UnicodeDecodeError:
+                pass
+        mimetype = 'image/svg+xml' if extension == '.svg' else (
+            mimetypes.guess_type(name)[0] or 'application/octet-stream')
+        return PrecompressedBody(
+            body, mimetype,
+            cache_control=IMMUTABLE_CACHE_CONTROL if fingerprinted else f'public, max-age={ASSET_MAX_AGE}',
+            last_modified=datetime.datetime.fromtimestamp(int(mtime), datetime.timezone.utc))
+
+    def load(self):
+        mtimes = self._scan()
+        assets = {}
+        for name, mtime in mtimes.items():
+            previous = self.assets.get(name)
+            if previous is not None and self.mtimes.get(name) == mtime:
+                assets[name] = previous
+                continue
+            try:
+                assets[name] = self._build(name, mtime)
+            except Exception as e:
+                logger.error(f"Error caching asset {name}: {str(e)}")
+        self.assets, self.mtimes = assets, mtimes
+        self.reloads += 1
+        logger.info(f"Asset cache loaded: {self.stats()}")
+
+    def _watch(self):
+        global game_page
+        while True:
+            time.sleep(self.interval)
+            try:
+                mtimes = self._scan()
+                if mtimes != self.mtimes:
+                    page_changed = mtimes.get('dist/manifest.json') != self.mtimes.get('dist/manifest.json')
+                    self.load()
+                    if page_changed:
+                        game_page = PrecompressedBody(load_built_page() or GAME_PAGE_HTML.encode('utf-8'),
+                                                      'text/html', cache_control='no-cache')
+            except Exception as e:
+                logger.error(f"Error reloading assets: {str(e)}")
+
+    def get(self, name):
+        return self.assets.get(name)
+
+    def stats(self):
+        assets = self.assets
+        totals = {'files': len(assets), 'reloads': self.reloads,
+                  'source_bytes': sum(self.source_bytes.get(name, 0) for name in assets)}
+        for asset in assets.values():
+            for encoding, size in asset.sizes().items():
+                totals[f'{encoding}_bytes'] = totals.get(f'{encoding}_bytes', 0) + size
+        return totals
+
+asset_cache = AssetCache()
+logger.info(f"Game page built: {game_page.sizes()}")
+
 @app.route('/', methods=['GET'])
 def index():
-    """Serve the game interface"""
-    logger.info("Serving main game interface")
+    """Serve the game interface, precompressed at startup"""
+    return game_page.response('index')
+
+@app.route('/download', methods=['GET'])
+def download_client():
+    """Provide information about downloading the game client"""
+    logger.info("Serving download page")
     return """
     <!DOCTYPE html>
     <html>
     <head>
-        <title>Cloud Defender</title>
+        <title>Download Cloud Defender</title>
         <style>
             body { 
                 font-family: Arial, sans-serif; 
                 text-align: center;
                 background-color: #232f3e;
                 color: white;
-                margin: 0;
-                padding: 0;
             }
-            h1 { color: #ff9900; margin-top: 20px; }
+            h1 { color: #ff9900; }
             .container {
                 max-width: 800px;
                 margin: 0 auto;
                 padding: 20px;
             }
-            .game-container {
-                width: 800px;
-                height: 600px;
-                margin: 0 auto;
-                background-color: #000;
-                background-image: url('data:image/svg+xml;utf8,<svg xmlns="http://www.w3.org/2000/svg" width="800" height="600" viewBox="0 0 800 600"><rect width="800" height="600" fill="%23000033"/><circle cx="50" cy="50" r="1" fill="%23fff" opacity="0.3"/><circle cx="150" cy="80" r="0.8" fill="%23fff" opacity="0.4"/><circle cx="250" cy="150" r="0.6" fill="%23fff" opacity="0.3"/><circle cx="350" cy="220" r="1.2" fill="%23fff" opacity="0.5"/><circle cx="450" cy="280" r="0.7" fill="%23fff" opacity="0.3"/><circle cx="550" cy="350" r="0.9" fill="%23fff" opacity="0.4"/><circle cx="650" cy="420" r="1.1" fill="%23fff" opacity="0.5"/><circle cx="750" cy="480" r="0.8" fill="%23fff" opacity="0.3"/><circle cx="100" cy="520" r="1" fill="%23fff" opacity="0.4"/><circle cx="200" cy="100" r="0.7" fill="%23fff" opacity="0.3"/><circle cx="300" cy="180" r="0.9" fill="%23fff" opacity="0.5"/><circle cx="400" cy="250" r="0.6" fill="%23fff" opacity="0.3"/><circle cx="500" cy="320" r="1.2" fill="%23fff" opacity="0.4"/><circle cx="600" cy="390" r="0.8" fill="%23fff" opacity="0.3"/><circle cx="700" cy="460" r="0.7" fill="%23fff" opacity="0.5"/><circle cx="120" cy="540" r="0.9" fill="%23fff" opacity="0.4"/><path d="M0,150 Q400,50 800,200" stroke="%234B0082" stroke-width="3" fill="none" opacity="0.2"/><path d="M0,300 Q400,400 800,350" stroke="%234B0082" stroke-width="2" fill="none" opacity="0.1"/><path d="M0,450 Q400,500 800,400" stroke="%234B0082" stroke-width="4" fill="none" opacity="0.15"/></svg>');
-                position: relative;
-                overflow: hidden;
-                border: 2px solid #ff9900;
-                border-radius: 5px;
-            }
-            .player {
-                width: 40px;
-                height: 60px;
-                background-image: url('/assets/spaceship.svg');
-                background-size: contain;
-                background-repeat: no-repeat;
-                position: absolute;
-                bottom: 60px;
-                left: 50%;
-                transform: translateX(-50%);
-                z-index: 10;
-                filter: drop-shadow(0 0 10px #00aaff);
-            }
-            .bullet {
-                width: 8px;
-                height: 16px;
-                background-image: url('/assets/bullet.svg');
-                background-size: contain;
-                background-repeat: no-repeat;
-                position: absolute;
-                z-index: 5;
-                filter: drop-shadow(0 0 5px #ffff00);
-            }
-            .enemy-bullet {
-                width: 8px;
-                height: 16px;
-                background-image: url('/assets/enemy_bullet.svg');
-                background-size: contain;
-                background-repeat: no-repeat;
-                position: absolute;
-                z-index: 5;
-            }
-            .enemy {
-                width: 40px;
-                height: 40px;
-                position: absolute;
-                background-size: contain;
-                background-repeat: no-repeat;
-                z-index: 5;
-                filter: contrast(1.2) brightness(1.1);
-            }
-            .enemy.ddos { 
-                background-image: url('/assets/enemy_ddos.svg');
-                filter: drop-shadow(0 0 5px #ff3333);
-            }
-            .enemy.malware { 
-                background-image: url('/assets/enemy_malware.svg');
-                filter: drop-shadow(0 0 5px #33ff33);
-            }
-            .enemy.hacker { 
-                background-image: url('/assets/enemy_hacker.svg');
-                filter: drop-shadow(0 0 5px #3333ff);
-            }
-            .boss {
-                width: 80px;
-                height: 80px;
-                background-size: contain;
-                background-repeat: no-repeat;
-                position: absolute;
-                z-index: 15;
-            }
-            .boss.level1 {
-                background-image: url('/assets/boss_level1.svg');
-            }
-            .boss.level2 {
-                background-image: url('/assets/boss_level2.svg');
-            }
-            .boss.level3 {
-                background-image: url('/assets/boss_level3.svg');
-            }
-            .boss-health-container {
-                width: 80px;
-                height: 8px;
-                background-color: #333;
-                position: absolute;
-                border-radius: 4px;
-                overflow: hidden;
-                z-index: 16;
-            }
-            .boss-health-bar {
-                height: 100%;
-                background-color: #E91E63;
-                width: 100%;
-            }
-            .aws-resources {
-                width: 600px;
-                height: 40px;
-                background-image: url('assets/aws_resources.svg');
-                background-size: contain;
-                background-repeat: no-repeat;
-                position: absolute;
-                bottom: 0;
-                left: 50%;
-                transform: translateX(-50%);
-                z-index: 8;
-            }
-            .aws-health-container {
-                width: 600px;
-                height: 5px;
-                background-color: #333;
-                position: absolute;
-                bottom: 45px;
-                left: 50%;
-                transform: translateX(-50%);
-                border-radius: 2px;
-                overflow: hidden;
-                z-index: 9;
-            }
-            .aws-health-bar {
-                height: 100%;
-                background-color: #4CAF50;
-                width: 100%;
-            }
-            .powerup {
-                width: 30px;
-                height: 30px;
-                position: absolute;
-                background-size: contain;
-                background-repeat: no-repeat;
-                z-index: 7;
-                animation: pulse 1.5s infinite;
-            }
-            .powerup.health {
-                background-image: url('assets/powerup_health.svg');
-            }
-            .powerup.double {
-                background-image: url('assets/powerup_double.svg');
-            }
-            .powerup.shield {
-                background-image: url('assets/powerup_shield.svg');
-            }
-            @keyframes pulse {
-                0% { transform: scale(1); opacity: 1; }
-                50% { transform: scale(1.1); opacity: 0.8; }
-                100% { transform: scale(1); opacity: 1; }
-            }
-            .shield-effect {
-                width: 60px;
-                height: 80px;
-                border-radius: 50%;
-                border: 2px solid #FFC107;
-                position: absolute;
-                bottom: 50px;
-                left: 50%;
-                transform: translateX(-50%);
-                z-index: 9;
-                animation: shield-pulse 1s infinite;
-            }
-            @keyframes shield-pulse {
-                0% { box-shadow: 0 0 5px 2px rgba(255, 193, 7, 0.5); }
-                50% { box-shadow: 0 0 10px 5px rgba(255, 193, 7, 0.7); }
-                100% { box-shadow: 0 0 5px 2px rgba(255, 193, 7, 0.5); }
-            }
-            .explosion {
-                width: 40px;
-                height: 40px;
-                background-image: url('assets/explosion.svg');
-                background-size: contain;
-                background-repeat: no-repeat;
-                position: absolute;
-                z-index: 15;
-                animation: explode 0.5s forwards;
-            }
-            @keyframes explode {
-                0% { transform: scale(0.5); opacity: 1; }
-                100% { transform: scale(1.5); opacity: 0; }
-            }
-            .level-up {
-                position: absolute;
-                top: 50%;
-                left: 50%;
-                transform: translate(-50%, -50%);
-                color: #FF9900;
-                font-size: 48px;
-                font-weight: bold;
-                text-shadow: 0 0 10px #FF5722;
-                opacity: 0;
-                z-index: 20;
-                animation: levelUp 2s forwards;
-            }
-            @keyframes levelUp {
-                0% { opacity: 0; transform: translate(-50%, -50%) scale(0.5); }
-                50% { opacity: 1; transform: translate(-50%, -50%) scale(1.2); }
-                100% { opacity: 0; transform: translate(-50%, -50%) scale(1.5); }
-            }
-            .game-info {
+            .info-box {
                 background-color: #1a232e;
                 border-radius: 10px;
                 padding: 20px;
                 margin: 20px 0;
-            }
-            .score-table {
-                width: 100%;
-                border-collapse: collapse;
-                margin-top: 20px;
-            }
-            .score-table th, .score-table td {
-                padding: 10px;
-                border: 1px solid #465973;
-            }
-            .score-table th {
-                background-color: #465973;
+                text-align: left;
             }
             .button {
                 background-color: #ff9900;
@@ -514,1571 +1569,15 @@ def index():
                 font-weight: bold;
                 cursor: pointer;
                 margin: 10px;
+                text-decoration: none;
+                display: inline-block;
             }
-            .button:hover {
-                background-color: #ffac33;
-            }
-            .hud {
-                display: flex;
-                justify-content: space-between;
-                padding: 10px;
-                background-color: rgba(0,0,0,0.7);
-                position: absolute;
-                top: 0;
-                left: 0;
-                right: 0;
-                z-index: 20;
-            }
-            .health-bar {
-                width: 200px;
-                height: 20px;
-                background-color: #ff0000;
-                position: relative;
-                border-radius: 10px;
-                overflow: hidden;
-            }
-            .health-bar-fill {
-                height: 100%;
-                background-color: #00cc00;
-                width: 100%;
-                transition: width 0.3s;
-            }
-            .game-over {
-                position: absolute;
-                top: 50%;
-                left: 50%;
-                transform: translate(-50%, -50%);
-                text-align: center;
-                color: white;
-                font-size: 24px;
-                background-color: rgba(0,0,0,0.8);
-                padding: 20px;
-                border-radius: 10px;
-                display: none;
-                z-index: 30;
-            }
-            .controls {
-                margin-top: 10px;
-                display: flex;
-                justify-content: center;
-            }
-            .control-btn {
-                background-color: #465973;
-                color: white;
-                border: none;
-                padding: 15px 25px;
-                margin: 0 10px;
-                border-radius: 5px;
-                font-weight: bold;
-                cursor: pointer;
-                font-size: 18px;
-            }
-            .shoot-btn {
-                background-color: #ff9900;
-                padding: 15px 40px;
-            }
-            
-            .debug-overlay {
-                position: absolute;
-                top: 10px;
-                right: 10px;
-                background-color: rgba(0,0,0,0.7);
-                color: white;
-                padding: 5px;
-                font-size: 12px;
-                z-index: 100;
-                display: none;
-            }
-            
-            /* Hitbox visualization for debugging */
-            .hitbox-debug {
-                position: absolute;
-                border-radius: 50%;
-                pointer-events: none;
-                z-index: 100;
-                display: none;
-            }
-            .bullet-hitbox {
-                border: 1px solid yellow;
-                opacity: 0.5;
-            }
-            .enemy-hitbox {
-                border: 1px solid red;
-                opacity: 0.5;
-            }
-            
-            /* Difficulty selector */
-            .difficulty-selector {
-                margin: 15px 0;
-                padding: 10px;
-                background-color: #2d3e50;
-                border-radius: 5px;
-            }
-            
-            .difficulty-btn {
-                background-color: #465973;
-                color: white;
-                border: none;
-                padding: 8px 15px;
-                margin: 0 5px;
-                border-radius: 5px;
-                font-weight: bold;
-                cursor: pointer;
-            }
-            
-            .difficulty-btn.selected {
-                background-color: #ff9900;
-                color: #232f3e;
-            }
-            
-            /* Control mode buttons */
-            .control-mode-btn {
-                background-color: #465973;
-                color: white;
-                border: none;
-                padding: 8px 15px;
-                margin: 0 5px;
-                border-radius: 5px;
-                font-weight: bold;
-                cursor: pointer;
-            }
-            
-            .control-mode-btn.selected {
-                background-color: #ff9900;
-                color: #232f3e;
-            }
-            
-            /* Settings sections */
-            .settings-section {
-                margin: 15px 0;
-                padding: 10px;
-                background-color: #2d3e50;
-                border-radius: 5px;
-            }
-            
-            .settings-section h3 {
-                margin-top: 0;
-                color: #ff9900;
-            }
-            
-            /* Difficulty modal */
-            .difficulty-modal {
-                position: absolute;
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-                background-color: rgba(0,0,0,0.9);
-                display: flex;
-                justify-content: center;
-                align-items: center;
-                z-index: 50;
-            }
-            
-            .difficulty-modal-content {
-                background-color: #1a232e;
-                padding: 30px;
-                border-radius: 10px;
-                text-align: center;
-                border: 2px solid #ff9900;
-                width: 80%;
-                max-width: 500px;
-            }
-            
-            .difficulty-buttons, .control-mode-buttons {
-                margin: 10px 0;
-                display: flex;
-                justify-content: center;
-                flex-wrap: wrap;
-            }
-            
-            /* Make the game container responsive */
-            @media (max-width: 820px) {
-                .game-container {
-                    width: 100%;
-                    height: 500px;
-                }
-                .container {
-                    width: 100%;
-                    padding: 10px;
-                }
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <h1>Cloud Defender</h1>
-            
-            <div class="game-container" id="game-container">
-                <div class="hud">
-                    <div>
-                        <div class="health-bar">
-                            <div class="health-bar-fill" id="health-bar"></div>
-                        </div>
-                        <div id="health-text">Health: 100</div>
-                    </div>
-                    <div>
-                        <div id="score">Score: 0</div>
-                        <div id="level">Level: 1</div>
-                    </div>
-                </div>
-                <div class="player" id="player"></div>
-                <div class="aws-resources" id="aws-resources"></div>
-                <div class="aws-health-container">
-                    <div class="aws-health-bar" id="aws-health-bar"></div>
-                </div>
-                <div class="game-over" id="game-over">
-                    <h2>GAME OVER</h2>
-                    <p id="final-score">Final Score: 0</p>
-                    <form id="score-form">
-                        <input type="text" id="player-name" placeholder="Your Name" required>
-                        <button type="submit" class="button">Submit Score</button>
-                    </form>
-                </div>
-                <div class="debug-overlay" id="debug-overlay"></div>
-            <div class="difficulty-modal" id="difficulty-modal">
-                <div class="difficulty-modal-content">
-                    <h2>Select Game Settings</h2>
-                    
-                    <div class="settings-section">
-                        <h3>Difficulty:</h3>
-                        <div class="difficulty-buttons">
-                            <button class="difficulty-btn selected" id="modal-easy-btn">Easy</button>
-                            <button class="difficulty-btn" id="modal-medium-btn">Medium</button>
-                            <button class="difficulty-btn" id="modal-hard-btn">Hard</button>
-                        </div>
-                    </div>
-                    
-                    <div class="settings-section">
-                        <h3>Control Mode:</h3>
-                        <div class="control-mode-buttons">
-                            <button class="control-mode-btn selected" id="touch-mode-btn">Touch/Click</button>
-                            <button class="control-mode-btn" id="keyboard-mode-btn">Keyboard</button>
-                            <button class="control-mode-btn" id="mouse-mode-btn">Mouse</button>
-                        </div>
-                    </div>
-                    
-                    <button class="button" id="start-game-btn">Start Game</button>
-                </div>
-            </div>
-            </div>
-            
-            <div class="controls">
-                <button class="control-btn" id="left-btn">◀ LEFT</button>
-                <button class="control-btn shoot-btn" id="shoot-btn">SHOOT</button>
-                <button class="control-btn" id="right-btn">RIGHT ▶</button>
-            </div>
-            
-            <div class="game-info">
-                <h2>Game Description</h2>
-                <p>Defend your AWS cloud infrastructure from various threats! Control your AWS Shield and shoot down malicious entities before they breach your defenses.</p>
-                <p>This game runs in a serverless container on Amazon ECS with Fargate and stores high scores in DynamoDB.</p>
-                <h3>How to Play</h3>
-                <p>Use the LEFT and RIGHT buttons to move and SHOOT button to fire.</p>
-                <p>On desktop, you can also use arrow keys to move and spacebar to shoot.</p>
-                <a href="/download" class="button">Download Full Game Client</a>
-            </div>
-            
-            <div class="game-info">
-                <h2>High Scores</h2>
-                <div id="high-scores">Loading high scores...</div>
-            </div>
-        </div>
-        
-        <script>
-            // Game variables
-            const gameContainer = document.getElementById('game-container');
-            const player = document.getElementById('player');
-            const healthBar = document.getElementById('health-bar');
-            const healthText = document.getElementById('health-text');
-            const scoreDisplay = document.getElementById('score');
-            const levelDisplay = document.getElementById('level');
-            const gameOverScreen = document.getElementById('game-over');
-            const finalScoreDisplay = document.getElementById('final-score');
-            const debugOverlay = document.getElementById('debug-overlay');
-            const difficultyModal = document.getElementById('difficulty-modal');
-            const awsHealthBar = document.getElementById('aws-health-bar');
-            
-            // Difficulty buttons in modal
-            const easyBtn = document.getElementById('modal-easy-btn');
-            const mediumBtn = document.getElementById('modal-medium-btn');
-            const hardBtn = document.getElementById('modal-hard-btn');
-            const startGameBtn = document.getElementById('start-game-btn');
-            
-            // Control mode buttons
-            const touchModeBtn = document.getElementById('touch-mode-btn');
-            const keyboardModeBtn = document.getElementById('keyboard-mode-btn');
-            const mouseModeBtn = document.getElementById('mouse-mode-btn');
-            
-            let playerX = 400;
-            let playerHealth = 100;
-            let awsHealth = 100;
-            let score = 0;
-            let level = 1;
-            let bullets = [];
-            let enemyBullets = [];
-            let enemies = [];
-            let powerups = [];
-            let boss = null;
-            let bossActive = false;
-            let bossHealth = 0;
-            let bossMaxHealth = 0;
-            let gameOver = false;
-            let gameActive = false;
-            let difficulty = 'easy'; // Default difficulty
-            let controlMode = 'touch'; // Default control mode
-            let enemiesDefeated = 0;
-            let enemiesRequiredForBoss = 20; // Number of enemies to defeat before boss appears
-            let hasShield = false;
-            let hasDoubleShot = false;
-            let shieldElement = null;
-            
-            // Constants
-            const PLAYER_SPEED = 10;
-            const BULLET_SPEED = 8;
-            const ENEMY_BULLET_SPEED = 5;
-            const POWERUP_SPEED = 2;
-            let ENEMY_SPEED = 2; // Will be adjusted based on difficulty
-            let MAX_ENEMIES = 8; // Will be adjusted based on difficulty
-            const CONTAINER_WIDTH = 800;
-            const CONTAINER_HEIGHT = 600;
-            const ENEMY_SHOOTING_CHANCE = 0.005; // Chance of enemy shooting per frame
-            const BOSS_SHOOTING_CHANCE = 0.05; // Chance of boss shooting per frame
-            const BOSS_MOVE_CHANCE = 0.02; // Chance of boss changing direction
-            const POWERUP_DROP_CHANCE = 0.3; // Chance of enemy dropping powerup when destroyed
-            const SHIELD_DURATION = 10000; // Shield powerup duration in milliseconds
-            const DOUBLE_SHOT_DURATION = 15000; // Double shot powerup duration in milliseconds
-            
-            // Enemy types
-            const ENEMY_TYPES = ['ddos', 'malware', 'hacker'];
-            
-            // Powerup types
-            const POWERUP_TYPES = ['health', 'double', 'shield'];
-            
-            // Difficulty settings
-            const DIFFICULTY_SETTINGS = {
-                easy: {
-                    enemySpeed: 2.0,
-                    maxEnemies: 6,
-                    spawnBaseDelay: 2000,
-                    spawnLevelFactor: 100,
-                    minSpawnDelay: 800,
-                    enemyShootingMultiplier: 0.5,
-                    bossHealthMultiplier: 1.0,
-                    powerupDropChanceMultiplier: 1.5
-                },
-                medium: {
-                    enemySpeed: 2.5,
-                    maxEnemies: 8,
-                    spawnBaseDelay: 1800,
-                    spawnLevelFactor: 120,
-                    minSpawnDelay: 700,
-                    enemyShootingMultiplier: 1.0,
-                    bossHealthMultiplier: 1.5,
-                    powerupDropChanceMultiplier: 1.0
-                },
-                hard: {
-                    enemySpeed: 3.0,
-                    maxEnemies: 10,
-                    spawnBaseDelay: 1500,
-                    spawnLevelFactor: 150,
-                    minSpawnDelay: 500,
-                    enemyShootingMultiplier: 1.5,
-                    bossHealthMultiplier: 2.0,
-                    powerupDropChanceMultiplier: 0.7
-                }
-            };
-            
-            // Initialize player position
-            player.style.left = playerX + 'px';
-            
-            // Control buttons
-            document.getElementById('left-btn').addEventListener('mousedown', () => movePlayer('left'));
-            document.getElementById('right-btn').addEventListener('mousedown', () => movePlayer('right'));
-            document.getElementById('shoot-btn').addEventListener('click', shootBullet);
-            
-            // Difficulty buttons in modal
-            easyBtn.addEventListener('click', () => selectDifficulty('easy'));
-            mediumBtn.addEventListener('click', () => selectDifficulty('medium'));
-            hardBtn.addEventListener('click', () => selectDifficulty('hard'));
-            
-            // Control mode buttons
-            touchModeBtn.addEventListener('click', () => selectControlMode('touch'));
-            keyboardModeBtn.addEventListener('click', () => selectControlMode('keyboard'));
-            mouseModeBtn.addEventListener('click', () => selectControlMode('mouse'));
-            
-            startGameBtn.addEventListener('click', startGame);
-            
-            // Keyboard controls
-            document.addEventListener('keydown', (e) => {
-                if (!gameActive) return;
-                
-                // Prevent default spacebar behavior (scrolling)
-                if (e.key === ' ' || e.code === 'Space') {
-                    e.preventDefault();
-                    shootBullet();
-                }
-                
-                if (e.key === 'ArrowLeft') {
-                    movePlayer('left');
-                } else if (e.key === 'ArrowRight') {
-                    movePlayer('right');
-                }
-            });
-            
-            // Set difficulty
-            function selectDifficulty(newDifficulty) {
-                difficulty = newDifficulty;
-                
-                // Update UI
-                easyBtn.classList.remove('selected');
-                mediumBtn.classList.remove('selected');
-                hardBtn.classList.remove('selected');
-                
-                if (newDifficulty === 'easy') {
-                    easyBtn.classList.add('selected');
-                } else if (newDifficulty === 'medium') {
-                    mediumBtn.classList.add('selected');
-                } else {
-                    hardBtn.classList.add('selected');
-                }
-            }
-            
-            // Set control mode
-            function selectControlMode(newControlMode) {
-                controlMode = newControlMode;
-                
-                // Update UI
-                touchModeBtn.classList.remove('selected');
-                keyboardModeBtn.classList.remove('selected');
-                mouseModeBtn.classList.remove('selected');
-                
-                if (newControlMode === 'touch') {
-                    touchModeBtn.classList.add('selected');
-                } else if (newControlMode === 'keyboard') {
-                    keyboardModeBtn.classList.add('selected');
-                } else {
-                    mouseModeBtn.classList.add('selected');
-                }
-            }
-            
-            // Functions
-            function startGame() {
-                // Hide difficulty modal
-                difficultyModal.style.display = 'none';
-                
-                gameActive = true;
-                gameOver = false;
-                playerHealth = 100;
-                awsHealth = 100;
-                score = 0;
-                level = 1;
-                bullets = [];
-                enemyBullets = [];
-                enemies = [];
-                powerups = [];
-                boss = null;
-                bossActive = false;
-                enemiesDefeated = 0;
-                enemiesRequiredForBoss = 20 * level;
-                hasShield = false;
-                hasDoubleShot = false;
-                
-                // Clear any existing elements
-                const existingBullets = document.querySelectorAll('.bullet');
-                existingBullets.forEach(bullet => bullet.remove());
-                
-                const existingEnemyBullets = document.querySelectorAll('.enemy-bullet');
-                existingEnemyBullets.forEach(bullet => bullet.remove());
-                
-                const existingEnemies = document.querySelectorAll('.enemy');
-                existingEnemies.forEach(enemy => enemy.remove());
-                
-                const existingPowerups = document.querySelectorAll('.powerup');
-                existingPowerups.forEach(powerup => powerup.remove());
-                
-                const existingBoss = document.querySelector('.boss');
-                if (existingBoss) existingBoss.remove();
-                
-                const existingBossHealth = document.querySelector('.boss-health-container');
-                if (existingBossHealth) existingBossHealth.remove();
-                
-                const existingShield = document.querySelector('.shield-effect');
-                if (existingShield) existingShield.remove();
-                
-                // Reset displays
-                updateHealthBar();
-                updateAwsHealthBar();
-                scoreDisplay.textContent = 'Score: 0';
-                levelDisplay.textContent = 'Level: 1';
-                gameOverScreen.style.display = 'none';
-                
-                // Apply difficulty settings
-                const settings = DIFFICULTY_SETTINGS[difficulty];
-                ENEMY_SPEED = settings.enemySpeed;
-                MAX_ENEMIES = settings.maxEnemies;
-                
-                // Adjust difficulty based on control mode
-                // Mouse control is easier, so make it slightly harder
-                if (controlMode === 'mouse') {
-                    ENEMY_SPEED *= 1.2;
-                    MAX_ENEMIES += 1;
-                }
-                
-                // Show/hide control buttons based on mode
-                const controlsDiv = document.querySelector('.controls');
-                if (controlMode === 'touch') {
-                    controlsDiv.style.display = 'flex';
-                } else {
-                    controlsDiv.style.display = 'none';
-                }
-                
-                // Set up mouse controls if needed
-                if (controlMode === 'mouse') {
-                    gameContainer.style.cursor = 'none';
-                } else {
-                    gameContainer.style.cursor = 'default';
-                }
-                
-                // Start game loop
-                gameLoop();
-                
-                // Start enemy spawning
-                enemySpawnLoop();
-                
-                // Notify server
-                fetch('/game/start', { method: 'POST' });
-            }
-            
-            function movePlayer(direction) {
-                if (!gameActive) return;
-                
-                if (direction === 'left' && playerX > 40) {
-                    playerX -= PLAYER_SPEED;
-                } else if (direction === 'right' && playerX < CONTAINER_WIDTH - 40) {
-                    playerX += PLAYER_SPEED;
-                }
-                
-                player.style.left = playerX + 'px';
-                
-                // Notify server
-                fetch('/game/move', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ direction: direction })
-                });
-            }
-            
-            function activatePowerup(type) {
-                switch(type) {
-                    case 'health':
-                        // Heal player
-                        playerHealth = Math.min(100, playerHealth + 30);
-                        updateHealthBar();
-                        
-                        // Heal AWS resources
-                        awsHealth = Math.min(100, awsHealth + 20);
-                        updateAwsHealthBar();
-                        break;
-                        
-                    case 'double':
-                        // Check if already has double shot
-                        if (hasDoubleShot) {
-                            // Upgrade to quad shot
-                            hasDoubleShot = 'quad';
-                            
-                            // Show visual indicator
-                            player.style.filter = "brightness(1.5) hue-rotate(120deg)";
-                        } else {
-                            // Activate double shot
-                            hasDoubleShot = true;
-                            
-                            // Show visual indicator
-                            player.style.filter = "brightness(1.3) hue-rotate(240deg)";
-                        }
-                        
-                        // Set timeout to deactivate
-                        setTimeout(() => {
-                            hasDoubleShot = false;
-                            player.style.filter = "";
-                        }, DOUBLE_SHOT_DURATION);
-                        break;
-                        
-                    case 'shield':
-                        // Activate shield
-                        hasShield = true;
-                        
-                        // Create shield visual
-                        if (!shieldElement) {
-                            shieldElement = document.createElement('div');
-                            shieldElement.className = 'shield-effect';
-                            gameContainer.appendChild(shieldElement);
-                        }
-                        
-                        // Set timeout to deactivate
-                        setTimeout(() => {
-                            hasShield = false;
-                            if (shieldElement && shieldElement.parentNode) {
-                                shieldElement.parentNode.removeChild(shieldElement);
-                                shieldElement = null;
-                            }
-                        }, SHIELD_DURATION);
-                        break;
-                }
-                
-                // Show powerup message
-                showLevelUpMessage("POWERUP: " + type.toUpperCase());
-            }
-            
-            function shootBullet() {
-                if (!gameActive) return;
-                
-                // Limit bullet firing rate based on control mode
-                const now = Date.now();
-                if (controlMode === 'mouse' && bullets.length > 0) {
-                    // For mouse mode, enforce a cooldown between shots
-                    const lastBullet = bullets[bullets.length - 1];
-                    if (lastBullet.timestamp && now - lastBullet.timestamp < 300) {
-                        return; // Too soon to fire again
-                    }
-                }
-                
-                if (hasDoubleShot === 'quad') {
-                    // Create four bullets
-                    const positions = [
-                        { x: playerX - 15, y: CONTAINER_HEIGHT - 100 },
-                        { x: playerX - 5, y: CONTAINER_HEIGHT - 100 },
-                        { x: playerX + 5, y: CONTAINER_HEIGHT - 100 },
-                        { x: playerX + 15, y: CONTAINER_HEIGHT - 100 }
-                    ];
-                    
-                    positions.forEach(pos => {
-                        const bullet = document.createElement('div');
-                        bullet.className = 'bullet';
-                        bullet.style.left = (pos.x - 4) + 'px';
-                        bullet.style.bottom = '100px';
-                        gameContainer.appendChild(bullet);
-                        
-                        bullets.push({
-                            element: bullet,
-                            x: pos.x,
-                            y: pos.y,
-                            timestamp: now
-                        });
-                    });
-                } else if (hasDoubleShot === true) {
-                    // Create left bullet
-                    const leftBullet = document.createElement('div');
-                    leftBullet.className = 'bullet';
-                    leftBullet.style.left = (playerX - 15) + 'px';
-                    leftBullet.style.bottom = '100px';
-                    gameContainer.appendChild(leftBullet);
-                    
-                    bullets.push({
-                        element: leftBullet,
-                        x: playerX - 10,
-                        y: CONTAINER_HEIGHT - 100,
-                        timestamp: now
-                    });
-                    
-                    // Create right bullet
-                    const rightBullet = document.createElement('div');
-                    rightBullet.className = 'bullet';
-                    rightBullet.style.left = (playerX + 7) + 'px';
-                    rightBullet.style.bottom = '100px';
-                    gameContainer.appendChild(rightBullet);
-                    
-                    bullets.push({
-                        element: rightBullet,
-                        x: playerX + 10,
-                        y: CONTAINER_HEIGHT - 100,
-                        timestamp: now
-                    });
-                } else {
-                    // Create single bullet
-                    const bullet = document.createElement('div');
-                    bullet.className = 'bullet';
-                    bullet.style.left = (playerX - 4) + 'px';
-                    bullet.style.bottom = '100px';
-                    gameContainer.appendChild(bullet);
-                    
-                    bullets.push({
-                        element: bullet,
-                        x: playerX,
-                        y: CONTAINER_HEIGHT - 100,
-                        timestamp: now
-                    });
-                }
-                
-                // Notify server
-                fetch('/game/shoot', { method: 'POST' });
-            }
-            
-            function createEnemy() {
-                if (!gameActive || bossActive || enemies.length >= MAX_ENEMIES) return;
-                
-                const enemyX = Math.floor(Math.random() * (CONTAINER_WIDTH - 60)) + 30;
-                const enemyType = ENEMY_TYPES[Math.floor(Math.random() * ENEMY_TYPES.length)];
-                
-                const enemy = document.createElement('div');
-                enemy.className = 'enemy ' + enemyType;
-                enemy.style.left = enemyX + 'px';
-                enemy.style.top = '0px';
-                gameContainer.appendChild(enemy);
-                
-                // Add some randomness to enemy speed based on type
-                let speedMultiplier = 1.0;
-                if (enemyType === 'ddos') {
-                    speedMultiplier = 1.2; // Faster
-                } else if (enemyType === 'malware') {
-                    speedMultiplier = 1.0; // Medium
-                } else if (enemyType === 'hacker') {
-                    speedMultiplier = 0.8; // Slower
-                }
-                
-                // Determine if this enemy can shoot (only after level 1)
-                const canShoot = level > 1 && Math.random() < 0.3;
-                
-                enemies.push({
-                    element: enemy,
-                    x: enemyX,
-                    y: 0,
-                    type: enemyType,
-                    speed: ENEMY_SPEED * speedMultiplier,
-                    canShoot: canShoot
-                });
-            }
-            
-            function createBoss() {
-                if (!gameActive || bossActive) return;
-                
-                bossActive = true;
-                
-                // Calculate boss health based on level and difficulty
-                const settings = DIFFICULTY_SETTINGS[difficulty];
-                bossMaxHealth = 100 * level * settings.bossHealthMultiplier;
-                bossHealth = bossMaxHealth;
-                
-                // Determine boss type based on level
-                const bossLevel = (level - 1) % 3 + 1; // Cycles through 1, 2, 3
-                
-                // Create boss element
-                const bossElement = document.createElement('div');
-                bossElement.className = 'boss level' + bossLevel;
-                bossElement.style.left = (CONTAINER_WIDTH / 2 - 40) + 'px';
-                bossElement.style.top = '50px';
-                gameContainer.appendChild(bossElement);
-                
-                // Create boss health bar
-                const bossHealthContainer = document.createElement('div');
-                bossHealthContainer.className = 'boss-health-container';
-                bossHealthContainer.style.left = (CONTAINER_WIDTH / 2 - 40) + 'px';
-                bossHealthContainer.style.top = '40px';
-                
-                const bossHealthBar = document.createElement('div');
-                bossHealthBar.className = 'boss-health-bar';
-                bossHealthContainer.appendChild(bossHealthBar);
-                gameContainer.appendChild(bossHealthContainer);
-                
-                // Create boss object
-                boss = {
-                    element: bossElement,
-                    healthContainer: bossHealthContainer,
-                    healthBar: bossHealthBar,
-                    x: CONTAINER_WIDTH / 2 - 40,
-                    y: 50,
-                    width: 80,
-                    height: 80,
-                    speed: 2 + (level * 0.5),
-                    direction: Math.random() > 0.5 ? 1 : -1,
-                    lastShot: 0,
-                    level: bossLevel,
-                    lastPowerupDrop: 0
-                };
-                
-                // Show level up message
-                showLevelUpMessage("BOSS BATTLE!");
-            }
-            
-            function createPowerup(x, y) {
-                if (!gameActive || level <= 1) return; // No powerups in level 1
-                
-                const powerupType = POWERUP_TYPES[Math.floor(Math.random() * POWERUP_TYPES.length)];
-                
-                const powerup = document.createElement('div');
-                powerup.className = 'powerup ' + powerupType;
-                powerup.style.left = (x - 15) + 'px';
-                powerup.style.top = y + 'px';
-                gameContainer.appendChild(powerup);
-                
-                powerups.push({
-                    element: powerup,
-                    x: x,
-                    y: y,
-                    type: powerupType
-                });
-            }
-            
-            function showLevelUpMessage(message) {
-                const levelUpMsg = document.createElement('div');
-                levelUpMsg.className = 'level-up';
-                levelUpMsg.textContent = message;
-                gameContainer.appendChild(levelUpMsg);
-                
-                // Remove the message after animation completes
-                setTimeout(() => {
-                    if (levelUpMsg.parentNode) {
-                        levelUpMsg.parentNode.removeChild(levelUpMsg);
-                    }
-                }, 2000);
-            }
-            
-            function updateBossHealth() {
-                if (!boss || !bossActive) return;
-                
-                const healthPercent = (bossHealth / bossMaxHealth) * 100;
-                boss.healthBar.style.width = healthPercent + '%';
-                
-                // Change color based on health
-                if (healthPercent > 60) {
-                    boss.healthBar.style.backgroundColor = '#E91E63'; // Pink
-                } else if (healthPercent > 30) {
-                    boss.healthBar.style.backgroundColor = '#FF9800'; // Orange
-                } else {
-                    boss.healthBar.style.backgroundColor = '#F44336'; // Red
-                }
-            }
-            
-            function enemyShoot(enemy) {
-                if (!gameActive || !enemy.canShoot) return;
-                
-                const bullet = document.createElement('div');
-                bullet.className = 'enemy-bullet';
-                bullet.style.left = (enemy.x - 4) + 'px';
-                bullet.style.top = (enemy.y + 20) + 'px';
-                gameContainer.appendChild(bullet);
-                
-                enemyBullets.push({
-                    element: bullet,
-                    x: enemy.x,
-                    y: enemy.y + 20
-                });
-            }
-            
-            function bossShoot() {
-                if (!gameActive || !bossActive || !boss) return;
-                
-                // Create bullets from all four weapon ports
-                const bulletPositions = [
-                    { x: boss.x + 15, y: boss.y + 40 },  // Left
-                    { x: boss.x + 40, y: boss.y + 15 },  // Top
-                    { x: boss.x + 65, y: boss.y + 40 },  // Right
-                    { x: boss.x + 40, y: boss.y + 65 }   // Bottom
-                ];
-                
-                bulletPositions.forEach(pos => {
-                    const bullet = document.createElement('div');
-                    bullet.className = 'enemy-bullet';
-                    bullet.style.left = (pos.x - 4) + 'px';
-                    bullet.style.top = pos.y + 'px';
-                    gameContainer.appendChild(bullet);
-                    
-                    // Calculate direction towards player
-                    const dx = playerX - pos.x;
-                    const dy = (CONTAINER_HEIGHT - 40) - pos.y;
-                    const dist = Math.sqrt(dx * dx + dy * dy);
-                    
-                    enemyBullets.push({
-                        element: bullet,
-                        x: pos.x,
-                        y: pos.y,
-                        dx: dx / dist,  // Normalized direction
-                        dy: dy / dist
-                    });
-                });
-                
-                boss.lastShot = Date.now();
-            }
-            
-            function updateHealthBar() {
-                healthBar.style.width = playerHealth + '%';
-                healthText.textContent = 'Health: ' + playerHealth;
-                
-                // Change health bar color based on health level
-                if (playerHealth > 60) {
-                    healthBar.style.backgroundColor = '#00cc00'; // Green
-                } else if (playerHealth > 30) {
-                    healthBar.style.backgroundColor = '#ffcc00'; // Yellow
-                } else {
-                    healthBar.style.backgroundColor = '#ff0000'; // Red
-                }
-            }
-            
-            function updateAwsHealthBar() {
-                awsHealthBar.style.width = awsHealth + '%';
-                
-                // Change health bar color based on health level
-                if (awsHealth > 60) {
-                    awsHealthBar.style.backgroundColor = '#4CAF50'; // Green
-                } else if (awsHealth > 30) {
-                    awsHealthBar.style.backgroundColor = '#FFC107'; // Amber
-                } else {
-                    awsHealthBar.style.backgroundColor = '#F44336'; // Red
-                }
-            }
-            
-            function checkCollisions() {
-                // Check bullet-enemy collisions
-                for (let i = bullets.length - 1; i >= 0; i--) {
-                    if (i >= bullets.length) continue; // Safety check
-                    
-                    const bullet = bullets[i];
-                    const bulletRect = {
-                        x: bullet.x - 4,
-                        y: bullet.y - 8,
-                        width: 8,
-                        height: 16
-                    };
-                    
-                    // Check for boss collision first
-                    if (bossActive && boss) {
-                        const bossRect = {
-                            x: boss.x,
-                            y: boss.y,
-                            width: boss.width,
-                            height: boss.height
-                        };
-                        
-                        if (bulletRect.x < bossRect.x + bossRect.width &&
-                            bulletRect.x + bulletRect.width > bossRect.x &&
-                            bulletRect.y < bossRect.y + bossRect.height &&
-                            bulletRect.y + bulletRect.height > bossRect.y) {
-                            
-                            // Create explosion effect
-                            createExplosion(bullet.x, bullet.y);
-                            
-                            // Remove bullet
-                            if (bullet.element && bullet.element.parentNode) {
-                                bullet.element.remove();
-                            }
-                            bullets.splice(i, 1);
-                            
-                            // Damage boss
-                            bossHealth -= 5;
-                            updateBossHealth();
-                            
-                            // Check if boss is defeated
-                            if (bossHealth <= 0) {
-                                // Create big explosion
-                                createExplosion(boss.x + 40, boss.y + 40);
-                                createExplosion(boss.x + 20, boss.y + 20);
-                                createExplosion(boss.x + 60, boss.y + 20);
-                                createExplosion(boss.x + 20, boss.y + 60);
-                                createExplosion(boss.x + 60, boss.y + 60);
-                                
-                                // Remove boss
-                                boss.element.remove();
-                                boss.healthContainer.remove();
-                                
-                                // Award points
-                                score += 500 * level;
-                                scoreDisplay.textContent = 'Score: ' + score;
-                                
-                                // Level up
-                                level++;
-                                levelDisplay.textContent = 'Level: ' + level;
-                                
-                                // Show level up message
-                                showLevelUpMessage("LEVEL " + level);
-                                
-                                // Reset for next level
-                                bossActive = false;
-                                boss = null;
-                                enemiesDefeated = 0;
-                                enemiesRequiredForBoss = 20 * level;
-                            }
-                            
-                            continue;
-                        }
-                    }
-                    
-                    // Check for regular enemy collisions
-                    for (let j = enemies.length - 1; j >= 0; j--) {
-                        if (j >= enemies.length) continue; // Safety check
-                        
-                        const enemy = enemies[j];
-                        const enemyRect = {
-                            x: enemy.x - 20,
-                            y: enemy.y - 20,
-                            width: 40,
-                            height: 40
-                        };
-                        
-                        // Check for bullet-enemy collisions with pixel-perfect hit detection
-                        if (bulletRect.x < enemyRect.x + enemyRect.width &&
-                            bulletRect.x + bulletRect.width > enemyRect.x &&
-                            bulletRect.y < enemyRect.y + enemyRect.height &&
-                            bulletRect.y + bulletRect.height > enemyRect.y) {
-                            
-                            // Always consider it a hit if the centers are close enough
-                            const dx = bullet.x - enemy.x;
-                            const dy = bullet.y - enemy.y;
-                            const distance = Math.sqrt(dx * dx + dy * dy);
-                            
-                            // Increased hit radius for better hit detection
-                            const hitRadius = 25;
-                            let hit = distance < hitRadius;
-                            
-                            if (hit) {
-                                // Debug info
-                                if (debugOverlay) {
-                                    debugOverlay.textContent = `Hit: Bullet(${bullet.x},${bullet.y}) Enemy(${enemy.x},${enemy.y}) Dist:${distance.toFixed(2)}`;
-                                    debugOverlay.style.display = 'block';
-                                }
-                                
-                                // Create explosion effect
-                                createExplosion(enemy.x, enemy.y);
-                                
-                                // Collision detected
-                                if (bullet.element && bullet.element.parentNode) {
-                                    bullet.element.remove();
-                                }
-                                bullets.splice(i, 1);
-                                
-                                if (enemy.element && enemy.element.parentNode) {
-                                    enemy.element.remove();
-                                }
-                                
-                                // Check if enemy should drop powerup (only after level 1)
-                                if (level > 1) {
-                                    const settings = DIFFICULTY_SETTINGS[difficulty];
-                                    if (Math.random() < POWERUP_DROP_CHANCE * settings.powerupDropChanceMultiplier) {
-                                        createPowerup(enemy.x, enemy.y);
-                                    }
-                                }
-                                
-                                enemies.splice(j, 1);
-                                
-                                // Increment enemies defeated counter
-                                enemiesDefeated++;
-                                
-                                score += 10 * level;
-                                scoreDisplay.textContent = 'Score: ' + score;
-                            }
-                            break;
-                        }
-                    }
-                }
-                
-                // Check enemy bullet-player collisions
-                for (let i = enemyBullets.length - 1; i >= 0; i--) {
-                    if (i >= enemyBullets.length) continue; // Safety check
-                    
-                    const bullet = enemyBullets[i];
-                    const bulletRect = {
-                        x: bullet.x - 4,
-                        y: bullet.y - 8,
-                        width: 8,
-                        height: 16
-                    };
-                    
-                    const playerRect = {
-                        x: playerX - 20,
-                        y: CONTAINER_HEIGHT - 60,
-                        width: 40,
-                        height: 40
-                    };
-                    
-                    // Check for rectangle collision
-                    if (bulletRect.x < playerRect.x + playerRect.width &&
-                        bulletRect.x + bulletRect.width > playerRect.x &&
-                        bulletRect.y < playerRect.y + playerRect.height &&
-                        bulletRect.y + bulletRect.height > playerRect.y) {
-                        
-                        // Create explosion effect
-                        createExplosion(bullet.x, bullet.y);
-                        
-                        // Collision detected
-                        if (bullet.element && bullet.element.parentNode) {
-                            bullet.element.remove();
-                        }
-                        enemyBullets.splice(i, 1);
-                        
-                        // Check if player has shield
-                        if (!hasShield) {
-                            playerHealth -= 10;
-                            updateHealthBar();
-                            
-                            if (playerHealth <= 0) {
-                                endGame();
-                            }
-                        }
-                    }
-                }
-                
-                // Check enemy-player collisions
-                for (let i = enemies.length - 1; i >= 0; i--) {
-                    if (i >= enemies.length) continue; // Safety check
-                    
-                    const enemy = enemies[i];
-                    const enemyRect = {
-                        x: enemy.x - 20,
-                        y: enemy.y - 20,
-                        width: 40,
-                        height: 40
-                    };
-                    
-                    const playerRect = {
-                        x: playerX - 20,
-                        y: CONTAINER_HEIGHT - 60,
-                        width: 40,
-                        height: 40
-                    };
-                    
-                    // Check for rectangle collision
-                    if (enemyRect.x < playerRect.x + playerRect.width &&
-                        enemyRect.x + enemyRect.width > playerRect.x &&
-                        enemyRect.y < playerRect.y + playerRect.height &&
-                        enemyRect.y + enemyRect.height > playerRect.y) {
-                        
-                        // Create explosion effect
-                        createExplosion(enemy.x, enemy.y);
-                        
-                        // Collision detected
-                        if (enemy.element && enemy.element.parentNode) {
-                            enemy.element.remove();
-                        }
-                        enemies.splice(i, 1);
-                        
-                        // Check if player has shield
-                        if (!hasShield) {
-                            playerHealth -= 10;
-                            updateHealthBar();
-                            
-                            if (playerHealth <= 0) {
-                                endGame();
-                            }
-                        }
-                    }
-                }
-                
-                // Check powerup-player collisions with improved hit detection
-                for (let i = powerups.length - 1; i >= 0; i--) {
-                    if (i >= powerups.length) continue; // Safety check
-                    
-                    const powerup = powerups[i];
-                    const powerupRect = {
-                        x: powerup.x - 15,
-                        y: powerup.y - 15,
-                        width: 30,
-                        height: 30
-                    };
-                    
-                    const playerRect = {
-                        x: playerX - 20,
-                        y: CONTAINER_HEIGHT - 60,
-                        width: 40,
-                        height: 40
-                    };
-                    
-                    // First do a quick rectangle check
-                    if (powerupRect.x < playerRect.x + playerRect.width &&
-                        powerupRect.x + powerupRect.width > playerRect.x &&
-                        powerupRect.y < playerRect.y + playerRect.height &&
-                        powerupRect.y + powerupRect.height > playerRect.y) {
-                        
-                        // More precise collision detection based on distance
-                        const dx = powerup.x - playerX;
-                        const dy = powerup.y - (CONTAINER_HEIGHT - 40);
-                        const distance = Math.sqrt(dx * dx + dy * dy);
-                        
-                        if (distance < 35) { // Adjusted collision radius
-                            // Activate powerup
-                            activatePowerup(powerup.type);
-                            
-                            // Remove powerup
-                            if (powerup.element && powerup.element.parentNode) {
-                                powerup.element.remove();
-                            }
-                            powerups.splice(i, 1);
-                        }
-                    }
-                }
-                
-                // Check boss-player collision
-                if (bossActive && boss) {
-                    const bossRect = {
-                        x: boss.x,
-                        y: boss.y,
-                        width: boss.width,
-                        height: boss.height
-                    };
-                    
-                    const playerRect = {
-                        x: playerX - 20,
-                        y: CONTAINER_HEIGHT - 60,
-                        width: 40,
-                        height: 40
-                    };
-                    
-                    if (bossRect.x < playerRect.x + playerRect.width &&
-                        bossRect.x + bossRect.width > playerRect.x &&
-                        bossRect.y < playerRect.y + playerRect.height &&
-                        bossRect.y + bossRect.height > playerRect.y) {
-                        
-                        // Check if player has shield
-                        if (!hasShield) {
-                            // Severe damage to player
-                            playerHealth -= 30;
-                            updateHealthBar();
-                            
-                            // Create explosion
-                            createExplosion(playerX, CONTAINER_HEIGHT - 40);
-                            
-                            if (playerHealth <= 0) {
-                                endGame();
-                            }
-                        }
-                    }
-                }
-            }
-            
-            // Create explosion effect
-            function createExplosion(x, y) {
-                const explosion = document.createElement('div');
-                explosion.className = 'explosion';
-                explosion.style.left = (x - 20) + 'px';
-                explosion.style.top = (y - 20) + 'px';
-                gameContainer.appendChild(explosion);
-                
-                // Remove explosion element after animation completes
-                setTimeout(() => {
-                    if (explosion.parentNode) {
-                        explosion.parentNode.removeChild(explosion);
-                    }
-                }, 500);
-            }
-            
-            function endGame() {
-                gameActive = false;
-                gameOver = true;
-                
-                // Reset cursor if in mouse mode
-                if (controlMode === 'mouse') {
-                    gameContainer.style.cursor = 'default';
-                }
-                
-                // Create explosion for player ship
-                createExplosion(playerX, CONTAINER_HEIGHT - 40);
-                
-                finalScoreDisplay.textContent = 'Final Score: ' + score;
-                gameOverScreen.style.display = 'block';
-                
-                // Set up score submission
-                document.getElementById('score-form').addEventListener('submit', function(e) {
-                    e.preventDefault();
-                    const playerName = document.getElementById('player-name').value;
-                    
-                    fetch('/scores', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({
-                            player_name: playerName,
-                            score: score,
-                            level: level,
-                            difficulty: difficulty,
-                            control_mode: controlMode
-                        })
-                    })
-                    .then(response => response.json())
-                    .then(data => {
-                        alert('Score submitted!');
-                        // Show difficulty modal again
-                        difficultyModal.style.display = 'flex';
-                        gameOverScreen.style.display = 'none';
-                    })
-                    .catch(error => {
-                        console.error('Error:', error);
-                        alert('Error submitting score');
-                    });
-                });
-            }
-            
-            function gameLoop() {
-                if (!gameActive) return;
-                
-                // Move bullets
-                for (let i = bullets.length - 1; i >= 0; i--) {
-                    const bullet = bullets[i];
-                    bullet.y -= BULLET_SPEED;
-                    bullet.element.style.bottom = (CONTAINER_HEIGHT - bullet.y) + 'px';
-                    
-                    if (bullet.y < 0) {
-                        bullet.element.remove();
-                        bullets.splice(i, 1);
-                    }
-                }
-                
-                // Move enemy bullets
-                for (let i = enemyBullets.length - 1; i >= 0; i--) {
-                    const bullet = enemyBullets[i];
-                    
-                    // If this is a directed bullet (from boss)
-                    if (bullet.dx !== undefined && bullet.dy !== undefined) {
-                        bullet.x += bullet.dx * ENEMY_BULLET_SPEED;
-                        bullet.y += bullet.dy * ENEMY_BULLET_SPEED;
-                        bullet.element.style.left = (bullet.x - 4) + 'px';
-                        bullet.element.style.top = bullet.y + 'px';
-                    } else {
-                        // Regular enemy bullet (moves straight down)
-                        bullet.y += ENEMY_BULLET_SPEED;
-                        bullet.element.style.top = bullet.y + 'px';
-                    }
-                    
-                    // Remove bullets that go off screen
-                    if (bullet.y > CONTAINER_HEIGHT || bullet.y < 0 || 
-                        bullet.x < 0 || bullet.x > CONTAINER_WIDTH) {
-                        bullet.element.remove();
-                        enemyBullets.splice(i, 1);
-                    }
-                }
-                
-                // Move enemies
-                for (let i = enemies.length - 1; i >= 0; i--) {
-                    const enemy = enemies[i];
-                    // Use enemy's individual speed if available
-                    const enemySpeed = enemy.speed || ENEMY_SPEED;
-                    enemy.y += enemySpeed;
-                    enemy.element.style.top = enemy.y + 'px';
-                    
-                    // Update enemy x position
-                    enemy.element.style.left = enemy.x + 'px';
-                    
-                    // Enemy shooting (only if they can shoot and after level 1)
-                    if (level > 1 && enemy.canShoot) {
-                        const settings = DIFFICULTY_SETTINGS[difficulty];
-                        if (Math.random() < ENEMY_SHOOTING_CHANCE * settings.enemyShootingMultiplier) {
-                            enemyShoot(enemy);
-                        }
-                    }
-                    
-                    // Check if enemy reached AWS resources
-                    if (enemy.y > CONTAINER_HEIGHT - 50) {
-                        // Damage AWS resources
-                        awsHealth -= 5;
-                        updateAwsHealthBar();
-                        
-                        // Create explosion
-                        createExplosion(enemy.x, enemy.y);
-                        
-                        // Remove enemy
-                        enemy.element.remove();
-                        enemies.splice(i, 1);
-                        
-                        // Check if AWS resources are destroyed
-                        if (awsHealth <= 0) {
-                            endGame();
-                        }
-                        
-                        continue;
-                    }
-                    
-                    // Remove enemies that go off screen
-                    if (enemy.y > CONTAINER_HEIGHT) {
-                        enemy.element.remove();
-                        enemies.splice(i, 1);
-                    }
-                }
-                
-                // Move powerups
-                for (let i = powerups.length - 1; i >= 0; i--) {
-                    const powerup = powerups[i];
-                    powerup.y += POWERUP_SPEED;
-                    powerup.element.style.top = powerup.y + 'px';
-                    
-                    // Remove powerups that go off screen
-                    if (powerup.y > CONTAINER_HEIGHT) {
-                        powerup.element.remove();
-                        powerups.splice(i, 1);
-                    }
-                }
-                
-                // Move boss
-                if (bossActive && boss) {
-                    // Move horizontally
-                    boss.x += boss.speed * boss.direction;
-                    
-                    // Bounce off walls
-                    if (boss.x <= 0 || boss.x >= CONTAINER_WIDTH - boss.width) {
-                        boss.direction *= -1;
-                    }
-                    
-                    // Random direction change
-                    if (Math.random() < BOSS_MOVE_CHANCE) {
-                        boss.direction *= -1;
-                    }
-                    
-                    // Update position
-                    boss.element.style.left = boss.x + 'px';
-                    boss.healthContainer.style.left = boss.x + 'px';
-                    
-                    // Boss shooting
-                    const settings = DIFFICULTY_SETTINGS[difficulty];
-                    if (Math.random() < BOSS_SHOOTING_CHANCE * settings.enemyShootingMultiplier) {
-                        bossShoot();
-                    }
-                    
-                    // Boss random powerup drop
-                    const now = Date.now();
-                    if (!boss.lastPowerupDrop || now - boss.lastPowerupDrop > 5000) { // At least 5 seconds between drops
-                        if (Math.random() < 0.02) { // 2% chance per frame
-                            const powerupType = POWERUP_TYPES[Math.floor(Math.random() * POWERUP_TYPES.length)];
-                            createPowerup(boss.x + Math.random() * boss.width, boss.y + boss.height);
-                            boss.lastPowerupDrop = now;
-                        }
-                    }
-                }
-                
-                // Update shield position if active
-                if (hasShield && shieldElement) {
-                    shieldElement.style.left = playerX + 'px';
-                }
-                
-                // Check collisions
-                checkCollisions();
-                
-                // Continue game loop
-                requestAnimationFrame(gameLoop);
-            }
-            
-            function enemySpawnLoop() {
-                if (!gameActive) return;
-                
-                // Don't spawn regular enemies during boss battle
-                if (!bossActive) {
-                    createEnemy();
-                    
-                    // Check if it's time for a boss
-                    if (enemiesDefeated >= enemiesRequiredForBoss) {
-                        createBoss();
-                    }
-                }
-                
-                // Adjust spawn rate based on difficulty and level
-                const settings = DIFFICULTY_SETTINGS[difficulty];
-                let spawnDelay = Math.max(
-                    settings.minSpawnDelay, 
-                    settings.spawnBaseDelay - (level * settings.spawnLevelFactor)
-                );
-                
-                // Adjust spawn rate based on control mode
-                if (controlMode === 'mouse') {
-                    spawnDelay *= 0.85; // Spawn enemies faster for mouse control
-                }
-                
-                setTimeout(enemySpawnLoop, spawnDelay);
-            }
-            
-            // Mouse controls
-            gameContainer.addEventListener('mousemove', (e) => {
-                if (!gameActive || controlMode !== 'mouse') return;
-                
-                // Get mouse position relative to game container
-                const rect = gameContainer.getBoundingClientRect();
-                const mouseX = e.clientX - rect.left;
-                
-                // Move player to mouse position (with boundaries)
-                if (mouseX > 20 && mouseX < CONTAINER_WIDTH - 20) {
-                    playerX = mouseX;
-                    player.style.left = playerX + 'px';
-                }
-            });
-            
-            gameContainer.addEventListener('click', (e) => {
-                if (!gameActive || controlMode !== 'mouse') return;
-                shootBullet();
-            });
-            
-            // Fetch high scores
-            fetch('/scores')
-                .then(response => response.json())
-                .then(data => {
-                    const scoresDiv = document.getElementById('high-scores');
-                    if (data.length === 0) {
-                        scoresDiv.innerHTML = '<p>No high scores yet. Be the first!</p>';
-                    } else {
-                        let table = '<table class="score-table"><tr><th>Player</th><th>Score</th><th>Level</th><th>Difficulty</th><th>Controls</th><th>Date</th></tr>';
-                        data.forEach(score => {
-                            const difficulty = score.difficulty || 'easy';
-                            const controlMode = score.control_mode || 'touch';
-                            table += `<tr><td>${score.player_name}</td><td>${score.score}</td><td>${score.level}</td><td>${difficulty}</td><td>${controlMode}</td><td>${new Date(score.timestamp * 1000).toLocaleString()}</td></tr>`;
-                        });
-                        table += '</table>';
-                        scoresDiv.innerHTML = table;
-                    }
-                })
-                .catch(error => {
-                    console.error('Error fetching scores:', error);
-                    document.getElementById('high-scores').innerHTML = '<p>Error loading high scores</p>';
-                });
-                
-            // Show difficulty modal at start
-            difficultyModal.style.display = 'flex';
-        </script>
-        <script src="/assets/debug.js"></script>
-        <script src="/assets/visual-effects.js"></script>
-        <link rel="stylesheet" href="/assets/visual-styles.css">
-    </body>
-    </html>
-    """
-
-@app.route('/download', methods=['GET'])
-def download_client():
-    """Provide information about downloading the game client"""
-    logger.info("Serving download page")
-    return """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Download Cloud Defender</title>
-        <style>
-            body { 
-                font-family: Arial, sans-serif; 
-                text-align: center;
-                background-color: #232f3e;
-                color: white;
-            }
-            h1 { color: #ff9900; }
-            .container {
-                max-width: 800px;
-                margin: 0 auto;
-                padding: 20px;
-            }
-            .info-box {
-                background-color: #1a232e;
-                border-radius: 10px;
-                padding: 20px;
-                margin: 20px 0;
-                text-align: left;
-            }
-            .button {
-                background-color: #ff9900;
-                color: #232f3e;
-                border: none;
-                padding: 10px 20px;
-                border-radius: 5px;
-                font-weight: bold;
-                cursor: pointer;
-                margin: 10px;
-                text-decoration: none;
-                display: inline-block;
-            }
-            .repo-link {
-                background-color: #2d3e50;
-                padding: 15px;
-                border-radius: 5px;
-                margin: 20px 0;
-                font-size: 18px;
+            .repo-link {
+                background-color: #2d3e50;
+                padding: 15px;
+                border-radius: 5px;
+                margin: 20px 0;
+                font-size: 18px;
             }
             .repo-link a {
                 color: #ff9900;
@@ -2117,70 +1616,1494 @@ def download_client():
     </html>
     """
 
+# Snowflake-style score ids: 41 bits of milliseconds since SCORE_ID_EPOCH, 10 bits of
+# worker id and a 12-bit per-millisecond sequence, zero-padded so string order is time order
+SCORE_ID_EPOCH_MS = 1704067200000  # 2024-01-01T00:00:00Z
+SCORE_ID_WORKER_BITS = 10
+SCORE_ID_SEQUENCE_BITS = 12
+SCORE_ID_DIGITS = 19
+
+# Item in the scores table whose counter hands out worker ids; never a score
+SCORE_ID_WORKER_COUNTER = '#score-id-worker'
+
+def lease_score_id_worker():
+    """Next worker id from an atomic counter in the scores table.
+
+    Every process that starts takes the next value, so live tasks get
+    distinct ids until 1024 more processes have started after them.
+    """
+    response = table.update_item(
+        Key={'id': SCORE_ID_WORKER_COUNTER},
+        UpdateExpression='ADD next_worker :one',
+        ExpressionAttributeValues={':one': 1},
+        ReturnValues='UPDATED_NEW')
+    return int(response['Attributes']['next_worker']) - 1
+
+def default_score_id_worker():
+    """SCORE_ID_WORKER if set, else a lease from DynamoDB, else a hash of TASK_ID (or hostname) and pid"""
+    if os.environ.get('SCORE_ID_WORKER'):
+        worker = int(os.environ['SCORE_ID_WORKER'])
+        if not 0 <= worker < 1 << SCORE_ID_WORKER_BITS:
+            raise ValueError(f"SCORE_ID_WORKER must be between 0 and {(1 << SCORE_ID_WORKER_BITS) - 1}")
+        return worker
+    if use_dynamodb:
+        try:
+            return lease_score_id_worker()
+        except Exception as e:
+            logger.error(f"Error leasing a score id worker, hashing one instead: {str(e)}")
+    import socket
+    import zlib
+    node = os.environ.get('TASK_ID') or socket.gethostname()
+    return zlib.crc32(f"{node}:{os.getpid()}".encode())
+
+class ScoreIdGenerator:
+    """Monotonic ids for one worker.
+
+    Ids from one generator strictly increase. Ids from different workers are
+    distinct only if their worker ids differ modulo 1024. The worker id is
+    picked on first use, and again in a process forked after that. If the
+    clock steps backwards, the generator keeps using the last timestamp until
+    the clock catches up; when a millisecond's 4096 sequence numbers run out
+    it waits for the next one.
+    """
+    def __init__(self, worker=None):
+        self._assigned = worker
+        self.worker = None if worker is None else worker % (1 << SCORE_ID_WORKER_BITS)
+        self._pid = os.getpid()
+        self._last_ms = -1
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self.generated = 0
+        self.sequence_waits = 0
+        self.collisions = 0
+
+    def next_int(self):
+        with self._lock:
+            if self._pid != os.getpid() and self.worker is not None and self._assigned is None:
+                # Forked after first use (gunicorn --preload): an explicit id would now be shared
+                if os.environ.get('SCORE_ID_WORKER'):
+                    raise RuntimeError("SCORE_ID_WORKER is shared by forked workers; "
+                                       "run one process per worker id or load the app after forking")
+                self.worker = None
+            if self.worker is None:
+                self._pid = os.getpid()
+                self.worker = default_score_id_worker() % (1 << SCORE_ID_WORKER_BITS)
+            now = int(time.time() * 1000) - SCORE_ID_EPOCH_MS
+            if now <= self._last_ms:
+                now = self._last_ms
+                self._sequence = (self._sequence + 1) & ((1 << SCORE_ID_SEQUENCE_BITS) - 1)
+                if self._sequence == 0:
+                    self.sequence_waits += 1
+                    while now <= self._last_ms:
+                        time.sleep(0.0001)
+                        now = int(time.time() * 1000) - SCORE_ID_EPOCH_MS
+            else:
+                self._sequence = 0
+            self._last_ms = now
+            self.generated += 1
+            return ((now << (SCORE_ID_WORKER_BITS + SCORE_ID_SEQUENCE_BITS))
+                    | (self.worker << SCORE_ID_SEQUENCE_BITS) | self._sequence)
+
+    def next_id(self):
+        return f"{self.next_int():0{SCORE_ID_DIGITS}d}"
+
+def score_id_time(score_id):
+    """Unix time in seconds encoded in a score id"""
+    return ((int(score_id) >> (SCORE_ID_WORKER_BITS + SCORE_ID_SEQUENCE_BITS)) + SCORE_ID_EPOCH_MS) / 1000
+
+def score_id_floor(unix_time):
+    """Smallest score id generated at or after unix_time, for id range queries"""
+    ms = max(int(unix_time * 1000) - SCORE_ID_EPOCH_MS, 0)
+    return f"{ms << (SCORE_ID_WORKER_BITS + SCORE_ID_SEQUENCE_BITS):0{SCORE_ID_DIGITS}d}"
+
+score_ids = ScoreIdGenerator()
+
+# Leaderboard index settings
+LEADERBOARD_SIZE = int(os.environ.get('LEADERBOARD_SIZE', 100))
+LEADERBOARD_REFRESH = int(os.environ.get('LEADERBOARD_REFRESH', 60))  # seconds, 0 = load once
+
+def score_value(item):
+    try:
+        return float(item.get('score', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+# DynamoDB leaderboard index: partition key "board", sort key "score" (see cloudformation/database.yaml)
+LEADERBOARD_INDEX = os.environ.get('LEADERBOARD_INDEX', 'leaderboard-index')
+LEADERBOARD_SHARDS = int(os.environ.get('LEADERBOARD_SHARDS', 4))
+
+def leaderboard_board(shard=None):
+    """Index partition for a score; writes are spread over LEADERBOARD_SHARDS partitions"""
+    if shard is None:
+        shard = secrets.randbelow(LEADERBOARD_SHARDS)
+    return f"all#{shard}"
+
+# Per-partition leaderboards by difficulty and control mode (the values the game client sends)
+SCORE_DIFFICULTIES = ('easy', 'medium', 'hard')
+SCORE_CONTROL_MODES = ('touch', 'keyboard', 'mouse')
+PARTITION_INDEX = os.environ.get('PARTITION_INDEX', 'partition-index')
+
+def score_partition(item):
+    """Partition key "<difficulty>#<control_mode>", or None for values outside the known sets"""
+    difficulty, control_mode = item.get('difficulty'), item.get('control_mode')
+    if difficulty in SCORE_DIFFICULTIES and control_mode in SCORE_CONTROL_MODES:
+        return f"{difficulty}#{control_mode}"
+    return None
+
+def query_partition_scores(partition, limit):
+    """Highest scores of one difficulty/control mode partition from the partition index"""
+    from boto3.dynamodb.conditions import Key
+    response = table.query(
+        IndexName=PARTITION_INDEX,
+        KeyConditionExpression=Key('partition').eq(partition),
+        ScanIndexForward=False,
+        Limit=limit
+    )
+    return response.get('Items', [])
+
+# Recent scores by id: partition key "board", sort key "id" (see cloudformation/database.yaml)
+RECENT_INDEX = os.environ.get('RECENT_INDEX', 'recent-index')
+
+def query_recent_scores(limit, before):
+    """Newest scores with ids below `before` from the recent index, merged across shards"""
+    from boto3.dynamodb.conditions import Key
+    items = []
+    for shard in range(LEADERBOARD_SHARDS):
+        response = table.query(
+            IndexName=RECENT_INDEX,
+            KeyConditionExpression=Key('board').eq(leaderboard_board(shard)) & Key('id').lt(before),
+            ScanIndexForward=False,
+            Limit=limit
+        )
+        items.extend(response.get('Items', []))
+    return heapq.nlargest(limit, items, key=lambda item: item['id'])
+
+def query_top_scores(limit):
+    """Highest scores from the leaderboard index, merged across shards"""
+    from boto3.dynamodb.conditions import Key
+    items = []
+    for shard in range(LEADERBOARD_SHARDS):
+        response = table.query(
+            IndexName=LEADERBOARD_INDEX,
+            KeyConditionExpression=Key('board').eq(leaderboard_board(shard)),
+            ScanIndexForward=False,
+            Limit=limit
+        )
+        items.extend(response.get('Items', []))
+    return heapq.nlargest(limit, items, key=score_value)
+
+def scan_scores():
+    """Yield every stored score, following DynamoDB scan pagination"""
+    kwargs = {}
+    while True:
+        response = table.scan(**kwargs)
+        for item in response.get('Items', []):
+            if item.get('id') != SCORE_ID_WORKER_COUNTER:
+                yield item
+        if 'LastEvaluatedKey' not in response:
+            break
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+# Bounded in-memory score store used in local mode and when DynamoDB writes fail
+SCORE_STORE_TOP_K = int(os.environ.get('SCORE_STORE_TOP_K', 1000))
+SCORE_STORE_RECENT = int(os.environ.get('SCORE_STORE_RECENT', 10000))
+SCORE_STORE_MAX_BYTES = int(os.environ.get('SCORE_STORE_MAX_BYTES', 4 * 1024 * 1024))
+
+class StringInterner:
+    """Reference-counted string table so repeated values are stored once"""
+    def __init__(self):
+        self.index = {}
+        self.values = []
+        self.refs = []
+        self.free = []
+        self.nbytes = 0
+
+    def acquire(self, value):
+        value = str(value)
+        i = self.index.get(value)
+        if i is None:
+            if self.free:
+                i = self.free.pop()
+                self.values[i] = value
+                self.refs[i] = 0
+            else:
+                i = len(self.values)
+                self.values.append(value)
+                self.refs.append(0)
+            self.index[value] = i
+            self.nbytes += sys.getsizeof(value)
+        self.refs[i] += 1
+        return i
+
+    def release(self, i):
+        self.refs[i] -= 1
+        if self.refs[i] == 0:
+            value = self.values[i]
+            del self.index[value]
+            self.values[i] = None
+            self.free.append(i)
+            self.nbytes -= sys.getsizeof(value)
+
+class MemoryScoreStore:
+    """Fixed-capacity score store with array-backed columns.
+
+    Keeps the top_k highest scores plus a ring of the `recent` newest
+    submissions; an entry occupies one slot while it is in either. A score
+    whose id is already held is skipped, so importing one twice is a no-op. Player
+    names, difficulty and control mode are interned. When the columns and
+    string tables exceed max_bytes, the oldest recent entries outside the
+    top K are dropped first.
+    """
+    # score, score_id, timestamp (8 bytes); level, name, difficulty, control_mode (4); id_digits, refs (1)
+    SLOT_BYTES = 3 * 8 + 4 * 4 + 2
+
+    def __init__(self, top_k=SCORE_STORE_TOP_K, recent=SCORE_STORE_RECENT, max_bytes=SCORE_STORE_MAX_BYTES):
+        self.top_k = max(top_k, 1)
+        # Columns may use at most half the budget; the rest is left for strings
+        self.recent = max(min(recent, max_bytes // 2 // self.SLOT_BYTES - self.top_k), 1)
+        self.max_bytes = max_bytes
+        capacity = self.top_k + self.recent
+        self.score = np.zeros(capacity, dtype=np.float64)
+        self.level = np.zeros(capacity, dtype=np.int32)
+        self.timestamp = np.zeros(capacity, dtype=np.int64)
+        self.score_id = np.zeros(capacity, dtype=np.int64)
+        self.id_digits = np.zeros(capacity, dtype=np.uint8)  # zero-padded width of numeric ids
+        self.name = np.zeros(capacity, dtype=np.int32)
+        self.difficulty = np.zeros(capacity, dtype=np.int32)
+        self.control_mode = np.zeros(capacity, dtype=np.int32)
+        self.refs = np.zeros(capacity, dtype=np.uint8)  # 1 per membership: top K, recent ring
+        self.free = list(range(capacity - 1, -1, -1))
+        self.text_ids = {}  # slot -> id for ids that are not integers
+        self.text_id_bytes = 0
+        self.slots_by_id = {}
+        self.strings = StringInterner()
+        self._top_keys = []  # (-score, sequence), ascending
+        self._top_slots = []
+        self._ring = deque()
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self.added = 0
+        self.evicted_recent = 0
+        self.evicted_top = 0
+        self.evicted_memory = 0
+        self.duplicates = 0
+
+    def _store(self, item):
+        slot = self.free.pop()
+        self.score[slot] = score_value(item)
+        try:
+            self.level[slot] = int(item.get('level', 1))
+        except (TypeError, ValueError, OverflowError):
+            self.level[slot] = 1
+        try:
+            self.timestamp[slot] = int(item.get('timestamp', 0))
+        except (TypeError, ValueError, OverflowError):
+            self.timestamp[slot] = 0
+        score_id = str(item.get('id', ''))
+        if score_id.isdigit() and int(score_id) < 2 ** 63 and len(score_id) < 256:
+            self.score_id[slot] = int(score_id)
+            self.id_digits[slot] = len(score_id)
+        else:
+            self.score_id[slot] = -1
+            self.text_ids[slot] = score_id
+            self.text_id_bytes += sys.getsizeof(score_id)
+        self.name[slot] = self.strings.acquire(item.get('player_name', 'Anonymous'))
+        self.difficulty[slot] = self.strings.acquire(item.get('difficulty', 'easy'))
+        self.control_mode[slot] = self.strings.acquire(item.get('control_mode', 'touch'))
+        self.slots_by_id[score_id] = slot
+        return slot
+
+    def _release(self, slot):
+        self.refs[slot] -= 1
+        if self.refs[slot] == 0:
+            for column in (self.name, self.difficulty, self.control_mode):
+                self.strings.release(int(column[slot]))
+            del self.slots_by_id[self._id(slot)]
+            score_id = self.text_ids.pop(slot, None)
+            if score_id is not None:
+                self.text_id_bytes -= sys.getsizeof(score_id)
+            self.free.append(slot)
+
+    def _id(self, slot):
+        score_id = int(self.score_id[slot])
+        return self.text_ids[slot] if score_id < 0 else f"{score_id:0{self.id_digits[slot]}d}"
+
+    def _item(self, slot):
+        score = float(self.score[slot])
+        return {
+            'id': self._id(slot),
+            'player_name': self.strings.values[self.name[slot]],
+            'score': int(score) if score.is_integer() else score,
+            'level': int(self.level[slot]),
+            'difficulty': self.strings.values[self.difficulty[slot]],
+            'control_mode': self.strings.values[self.control_mode[slot]],
+            'timestamp': int(self.timestamp[slot])
+        }
+
+    def _evict_oldest(self):
+        slot = self._ring.popleft()
+        self._release(slot)
+        return slot
+
+    def add(self, item):
+        """Store a score; returns False if its id is already held"""
+        with self._lock:
+            if str(item.get('id', '')) in self.slots_by_id:
+                self.duplicates += 1
+                return False
+            if len(self._ring) >= self.recent:
+                self._evict_oldest()
+                self.evicted_recent += 1
+            slot = self._store(item)
+            self.refs[slot] = 1
+            self._ring.append(slot)
+            key = (-float(self.score[slot]), self._sequence)
+            self._sequence += 1
+            if len(self._top_keys) < self.top_k or key < self._top_keys[-1]:
+                i = bisect.bisect_right(self._top_keys, key)
+                self._top_keys.insert(i, key)
+                self._top_slots.insert(i, slot)
+                self.refs[slot] += 1
+                if len(self._top_keys) > self.top_k:
+                    self._top_keys.pop()
+                    self._release(self._top_slots.pop())
+                    self.evicted_top += 1
+            self.added += 1
+            while self.resident_bytes() > self.max_bytes and len(self._ring) > 1:
+                self._evict_oldest()
+                self.evicted_memory += 1
+            return True
+
+    def append(self, item):
+        self.add(item)
+
+    def extend(self, items):
+        """Store scores; returns the ones whose ids were not already held"""
+        return [item for item in items if self.add(item)]
+
+    def top(self, k=10):
+        with self._lock:
+            return [self._item(slot) for slot in self._top_slots[:k]]
+
+    def newest(self, limit, before=None):
+        """Up to limit entries from the recent ring with ids below `before`, highest id first"""
+        with self._lock:
+            items = [self._item(slot) for slot in self._ring]
+        if before is not None:
+            items = [item for item in items if item['id'] < before]
+        return heapq.nlargest(limit, items, key=lambda item: item['id'])
+
+    def items(self):
+        """Snapshot of every stored score: the top K, then recent entries outside it"""
+        with self._lock:
+            slots = list(self._top_slots)
+            in_top = set(slots)
+            slots.extend(slot for slot in self._ring if slot not in in_top)
+            return [self._item(slot) for slot in slots]
+
+    def __iter__(self):
+        return iter(self.items())
+
+    def __len__(self):
+        return int(np.count_nonzero(self.refs))
+
+    def resident_bytes(self):
+        columns = (self.score, self.level, self.timestamp, self.score_id, self.id_digits,
+                   self.name, self.difficulty, self.control_mode, self.refs)
+        return (sum(column.nbytes for column in columns) + self.strings.nbytes + self.text_id_bytes +
+                sys.getsizeof(self.slots_by_id))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self),
+                'top_k': self.top_k,
+                'recent': len(self._ring),
+                'recent_capacity': self.recent,
+                'added': self.added,
+                'evicted_recent': self.evicted_recent,
+                'evicted_top': self.evicted_top,
+                'evicted_memory': self.evicted_memory,
+                'duplicates': self.duplicates,
+                'resident_bytes': self.resident_bytes(),
+                'max_bytes': self.max_bytes
+            }
+
+memory_scores = MemoryScoreStore()
+
+# Append-only score log on local disk; replayed into memory_scores at startup
+SCORE_LOG_PATH = os.environ.get('SCORE_LOG_PATH', '')
+SCORE_LOG_FSYNC = os.environ.get('SCORE_LOG_FSYNC', 'false').lower() == 'true'
+SCORE_LOG_COMPACT_RATIO = float(os.environ.get('SCORE_LOG_COMPACT_RATIO', 4))  # 0 = manual only
+
+# Fixed-width little-endian records; strings are UTF-8, truncated and NUL-padded
+SCORE_LOG_RECORD = np.dtype([
+    ('id', 'S24'), ('score', '<f8'), ('level', '<i4'), ('timestamp', '<i8'),
+    ('player_name', 'S64'), ('difficulty', 'S16'), ('control_mode', 'S16')
+])
+SCORE_LOG_MAGIC = b'CDSL'
+SCORE_LOG_HEADER = struct.Struct('<4sHH')  # magic, version, record size
+SCORE_LOG_VERSION = 1
+
+def log_text(value, size):
+    # Truncate on a character boundary so every stored field decodes cleanly
+    return str(value).encode('utf-8')[:size].decode('utf-8', 'ignore').encode('utf-8')
+
+def log_int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError, OverflowError):
+        return default
+
+class ScoreLog:
+    """Append-only file of fixed-width score records.
+
+    Appends are one write per batch of records. Replay memory-maps the file
+    and views it as a NumPy record array, so selecting what the memory store
+    retains (the top K and the newest entries) is vectorized and only the
+    retained rows are decoded. Compaction rewrites the file to that retained
+    set; it runs automatically once the log holds SCORE_LOG_COMPACT_RATIO
+    times more records than the store can keep. One process should own a log.
+    """
+    def __init__(self, path, store, fsync=SCORE_LOG_FSYNC, compact_ratio=SCORE_LOG_COMPACT_RATIO):
+        self.path = path
+        self.store = store
+        self.fsync = fsync
+        self.compact_threshold = (max(int(compact_ratio * (store.top_k + store.recent)), 1)
+                                  if compact_ratio > 0 else None)
+        self._lock = threading.Lock()
+        self.records = 0
+        self.appended = 0
+        self.replayed = 0
+        self.replay_ms = 0.0
+        self.compactions = 0
+        self.compacted_records = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = self._open()
+
+    def _open(self):
+        f = open(self.path, 'ab')
+        size = f.tell()
+        if size < SCORE_LOG_HEADER.size:
+            f.truncate(0)
+            f.write(SCORE_LOG_HEADER.pack(SCORE_LOG_MAGIC, SCORE_LOG_VERSION, SCORE_LOG_RECORD.itemsize))
+            f.flush()
+        else:
+            # Cut off a record torn by a crash mid-append, or every later record would be misaligned
+            torn = (size - SCORE_LOG_HEADER.size) % SCORE_LOG_RECORD.itemsize
+            if torn:
+                f.truncate(size - torn)
+                logger.warning(f"Dropped a torn {torn}-byte record from the end of {self.path}")
+        return f
+
+    def _read_records(self):
+        """Return the record array for the current file, dropping a torn final record"""
+        with open(self.path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size <= SCORE_LOG_HEADER.size:
+                return np.zeros(0, dtype=SCORE_LOG_RECORD)
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size = SCORE_LOG_HEADER.unpack_from(mapped)
+        if magic != SCORE_LOG_MAGIC or version != SCORE_LOG_VERSION or record_size != SCORE_LOG_RECORD.itemsize:
+            raise ValueError(f"Unsupported score log format in {self.path}")
+        count = (size - SCORE_LOG_HEADER.size) // SCORE_LOG_RECORD.itemsize
+        return np.frombuffer(mapped, dtype=SCORE_LOG_RECORD, count=count, offset=SCORE_LOG_HEADER.size)
+
+    @staticmethod
+    def _first_of_each_id(records):
+        """Indices of the first record logged for each id, in log order"""
+        return np.sort(np.unique(records['id'], return_index=True)[1])
+
+    def _retained(self, records):
+        """Indices of the records the memory store would keep, in log order.
+
+        An id logged more than once (a re-imported score) counts once.
+        """
+        unique = self._first_of_each_id(records)
+        count = len(unique)
+        if count <= self.store.top_k + self.store.recent:
+            return unique
+        scores = records['score'][unique]
+        top = np.argpartition(-scores, self.store.top_k - 1)[:self.store.top_k]
+        recent = np.arange(max(count - self.store.recent, 0), count)
+        return unique[np.union1d(top, recent)]
+
+    @staticmethod
+    def _item(record):
+        score = float(record['score'])
+        return {
+            'id': record['id'].decode('utf-8'),
+            'player_name': record['player_name'].decode('utf-8'),
+            'score': int(score) if score.is_integer() else score,
+            'level': int(record['level']),
+            'difficulty': record['difficulty'].decode('utf-8'),
+            'control_mode': record['control_mode'].decode('utf-8'),
+            'timestamp': int(record['timestamp'])
+        }
+
+    def replay(self):
+        """Load the retained records into the memory store; returns the record count"""
+        start = time.perf_counter()
+        with self._lock:
+            records = self._read_records()
+            self.records = len(records)
+            for i in self._retained(records):
+                self.store.add(self._item(records[i]))
+            del records
+        self.replayed = self.records
+        self.replay_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Replayed {self.records} scores from {self.path} in {self.replay_ms:.1f} ms")
+        if self.compact_threshold and self.records >= self.compact_threshold:
+            self.compact()
+        return self.records
+
+    @staticmethod
+    def encode(items):
+        records = np.zeros(len(items), dtype=SCORE_LOG_RECORD)
+        for i, item in enumerate(items):
+            records[i] = (
+                log_text(item.get('id', ''), 24),
+                score_value(item),
+                log_int(item.get('level', 1), 1),
+                log_int(item.get('timestamp', 0), 0),
+                log_text(item.get('player_name', 'Anonymous'), 64),
+                log_text(item.get('difficulty', 'easy'), 16),
+                log_text(item.get('control_mode', 'touch'), 16)
+            )
+        return records.tobytes()
+
+    def append(self, items):
+        data = self.encode(items)
+        with self._lock:
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.records += len(items)
+            self.appended += len(items)
+            compact = bool(self.compact_threshold) and self.records >= self.compact_threshold
+        if compact:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log to the records the memory store retains"""
+        start = time.perf_counter()
+        with self._lock:
+            self._file.flush()
+            records = self._read_records()
+            before = len(records)
+            kept = records[self._retained(records)]
+            tmp_path = f"{self.path}.compact"
+            with open(tmp_path, 'wb') as f:
+                f.write(SCORE_LOG_HEADER.pack(SCORE_LOG_MAGIC, SCORE_LOG_VERSION, SCORE_LOG_RECORD.itemsize))
+                f.write(kept.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            del records
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = self._open()
+            self.records = len(kept)
+            self.compactions += 1
+            self.compacted_records += before - len(kept)
+        logger.info(f"Compacted score log from {before} to {len(kept)} records "
+                    f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def iter_items(self, chunk=10000):
+        """Yield every logged score once, in log order, decoding one chunk at a time"""
+        with self._lock:
+            self._file.flush()
+            records = self._read_records()
+        unique = self._first_of_each_id(records)
+        for start in range(0, len(unique), chunk):
+            for record in records[unique[start:start + chunk]]:
+                yield self._item(record)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'records': self.records,
+            'bytes': SCORE_LOG_HEADER.size + self.records * SCORE_LOG_RECORD.itemsize,
+            'appended': self.appended,
+            'replayed': self.replayed,
+            'replay_ms': round(self.replay_ms, 3),
+            'compactions': self.compactions,
+            'compacted_records': self.compacted_records
+        }
+
+score_log = None
+score_log_opened = not SCORE_LOG_PATH
+score_log_lock = threading.Lock()
+
+@app.before_request
+def open_score_log():
+    """Open and replay the score log on the first request.
+
+    Opening it at import would also open it in processes that never serve:
+    the debug reloader's parent and scripts that import the app.
+    """
+    global score_log, score_log_opened
+    if score_log_opened:
+        return
+    with score_log_lock:
+        if score_log_opened:
+            return
+        try:
+            log = ScoreLog(SCORE_LOG_PATH, memory_scores)
+            log.replay()
+            atexit.register(log.close)
+            score_log = log
+        except Exception as e:
+            logger.error(f"Error opening score log {SCORE_LOG_PATH}: {str(e)}")
+        score_log_opened = True
+
+def remember_scores(items):
+    """Keep scores that are not in DynamoDB in memory and in the local score log"""
+    items = memory_scores.extend(items)
+    if score_log is not None and items:
+        try:
+            score_log.append(items)
+        except Exception as e:
+            logger.error(f"Error appending to score log: {str(e)}")
+
+def iter_stored_scores(limit=None):
+    """Yield stored scores for seeding the leaderboard.
+
+    With a limit this reads only the top of the DynamoDB leaderboard index and
+    of each partition in the partition index, falling back to a full scan if
+    either index is not available. A score may be yielded more than once.
+    """
+    if use_dynamodb:
+        if limit:
+            try:
+                items = query_top_scores(limit)
+                for difficulty in SCORE_DIFFICULTIES:
+                    for control_mode in SCORE_CONTROL_MODES:
+                        items.extend(query_partition_scores(f"{difficulty}#{control_mode}", limit))
+                yield from items
+            except Exception as e:
+                logger.error(f"Error querying leaderboard index, scanning instead: {str(e)}")
+                yield from scan_scores()
+        else:
+            yield from scan_scores()
+    yield from memory_scores.items()
+
+def leaderboard_key(item):
+    """Sort key: highest score first, then oldest, then by id, so pages are stable"""
+    return (-score_value(item), log_int(item.get('timestamp', 0), 0), str(item.get('id', '')))
+
+class Leaderboard:
+    """Bounded top-N score indexes, highest score first.
+
+    One board covers all scores and one covers each difficulty, control mode
+    and difficulty/control mode pair, so every filtered read is a slice of a
+    board no larger than the capacity. Boards are seeded from the top of the
+    score store, then updated on every save with a binary search insert.
+    Reloads every LEADERBOARD_REFRESH seconds to pick up scores saved by
+    other tasks.
+    """
+    def __init__(self, capacity=LEADERBOARD_SIZE, refresh=LEADERBOARD_REFRESH):
+        self.capacity = capacity
+        self.refresh = refresh
+        self._boards = self._empty_boards()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.loaded_at = None
+        self.loads = 0
+        # Bumped whenever a board changes; with the instance id it makes the /scores ETag
+        self.instance = secrets.token_hex(4)
+        self.version = 0
+
+    @staticmethod
+    def _empty_boards():
+        # (difficulty, control_mode) -> ([leaderboard_key, ...] ascending, [item, ...]); None matches any
+        return {(difficulty, control_mode): ([], [])
+                for difficulty in (None,) + SCORE_DIFFICULTIES
+                for control_mode in (None,) + SCORE_CONTROL_MODES}
+
+    def _insert(self, boards, item):
+        key = leaderboard_key(item)
+        difficulty = item.get('difficulty') if item.get('difficulty') in SCORE_DIFFICULTIES else None
+        control_mode = item.get('control_mode') if item.get('control_mode') in SCORE_CONTROL_MODES else None
+        names = {(None, None), (difficulty, None), (None, control_mode), (difficulty, control_mode)}
+        ranked = False
+        for name in names:
+            keys, items = boards[name]
+            if len(keys) >= self.capacity and key >= keys[-1]:
+                continue
+            i = bisect.bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                continue  # already on the board
+            keys.insert(i, key)
+            items.insert(i, item)
+            if len(keys) > self.capacity:
+                keys.pop()
+                items.pop()
+            ranked = True
+        return ranked
+
+    def add(self, item):
+        """Record a new score; returns True if it made any board"""
+        with self._lock:
+            ranked = self._insert(self._boards, item)
+            if ranked:
+                self.version += 1
+            return ranked
+
+    def load(self, scores):
+        """Rebuild the boards from an iterable of stored scores"""
+        boards = self._empty_boards()
+        for item in scores:
+            self._insert(boards, item)
+        with self._lock:
+            self._boards = boards
+            self.loaded_at = time.time()
+            self.loads += 1
+            self.version += 1
+        logger.info(f"Leaderboard loaded with {len(boards[None, None][1])} entries")
+
+    def stale(self):
+        if self.loaded_at is None:
+            return True
+        return self.refresh > 0 and time.time() - self.loaded_at > self.refresh
+
+    def ensure_loaded(self):
+        if not self.stale():
+            return
+        # The first load blocks; a refresh runs in one request while others read the current board
+        if self._load_lock.acquire(blocking=self.loaded_at is None):
+            try:
+                if self.stale():
+                    self.load(iter_stored_scores(self.capacity))
+            finally:
+                self._load_lock.release()
+
+    def top(self, k=10):
+        return self.page(k)[0]
+
+    def page(self, k=10, difficulty=None, control_mode=None, after=None):
+        """Return (items, more) for up to k scores ranked after the `after` key"""
+        with self._lock:
+            keys, items = self._boards[difficulty, control_mode]
+            start = bisect.bisect_right(keys, after) if after is not None else 0
+            return items[start:start + k], start + k < len(items)
+
+leaderboard = Leaderboard()
+
+# Serialized /scores response shared by the workers on a task
+SCORES_CACHE_TTL = float(os.environ.get('SCORES_CACHE_TTL', 30))
+SCORES_CACHE_PATH = os.environ.get('SCORES_CACHE_PATH', os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(), 'cloud-defender-scores.cache'))
+
+class SharedResponseCache:
+    """TTL cache of one serialized response, shared between processes through a file.
+
+    The file holds a generation number, an expiry time, an admission
+    threshold (the lowest score shown) and the body's ETag, followed by the
+    response bytes. Every read-modify-write happens under an flock on a
+    sibling lock file, and writers replace the data file atomically. Every
+    saved score bumps the generation, so a rebuild that started before the
+    save is never stored; a score above the threshold also drops the cached
+    body for every worker.
+    """
+    HEADER = struct.Struct('<Qdd16s')
+
+    def __init__(self, path=SCORES_CACHE_PATH, ttl=SCORES_CACHE_TTL):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return 0, 0.0, float('-inf'), '', b''
+        if len(data) < self.HEADER.size:
+            return 0, 0.0, float('-inf'), '', b''
+        generation, expires_at, threshold, tag = self.HEADER.unpack_from(data)
+        return generation, expires_at, threshold, tag.decode('ascii'), data[self.HEADER.size:]
+
+    def _write(self, generation, expires_at, threshold, tag, body):
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.HEADER.pack(generation, expires_at, threshold, tag.encode('ascii')))
+            f.write(body)
+        os.replace(tmp_path, self.path)
+
+    def get(self):
+        """Return (body, generation, etag); body and etag are None on a miss"""
+        generation, expires_at, _, tag, body = self._read()
+        if body and time.time() < expires_at:
+            self.hits += 1
+            return body, generation, tag
+        self.misses += 1
+        return None, generation, None
+
+    def put(self, body, threshold, generation):
+        """Store a body built after reading `generation`, unless a score was saved since.
+
+        Returns its ETag, derived from the content, or None if it was stale.
+        """
+        tag = hashlib.blake2b(body, digest_size=8).hexdigest()
+        with self._locked():
+            if self._read()[0] != generation:
+                return None
+            self._write(generation, time.time() + self.ttl, threshold, tag, body)
+        return tag
+
+    def score_saved(self, score):
+        """Record a saved score; drops the cached body if the score would appear in it"""
+        with self._locked():
+            generation, expires_at, threshold, tag, body = self._read()
+            if score > threshold:
+                self._write(generation + 1, 0.0, threshold, '', b'')
+                self.invalidations += 1
+            else:
+                self._write(generation + 1, expires_at, threshold, tag, body)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'invalidations': self.invalidations,
+            'ttl_seconds': self.ttl
+        }
+
+scores_cache = SharedResponseCache()
+
+def encode_cursor(item):
+    key = leaderboard_key(item)
+    return base64.urlsafe_b64encode(json.dumps([-key[0], key[1], key[2]]).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Leaderboard key encoded by encode_cursor; raises ValueError if malformed"""
+    try:
+        score, timestamp, score_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        return (-float(score), int(timestamp), str(score_id))
+    except (TypeError, ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+def scores_page():
+    """Filtered or paginated /scores read, straight from the partition boards"""
+    difficulty = request.args.get('difficulty') or None
+    control_mode = request.args.get('control_mode') or None
+    if difficulty is not None and difficulty not in SCORE_DIFFICULTIES:
+        return jsonify({'error': f"difficulty must be one of {', '.join(SCORE_DIFFICULTIES)}"}), 400
+    if control_mode is not None and control_mode not in SCORE_CONTROL_MODES:
+        return jsonify({'error': f"control_mode must be one of {', '.join(SCORE_CONTROL_MODES)}"}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), LEADERBOARD_SIZE)
+        after = decode_cursor(request.args['cursor']) if request.args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    leaderboard.ensure_loaded()
+    tag = f"lb.{leaderboard.instance}.{leaderboard.version}"
+    response = not_modified('scores', tag)
+    if response is not None:
+        return response
+    items, more = leaderboard.page(limit, difficulty, control_mode, after)
+    response = jsonify([public_score(item) for item in items])
+    response.set_etag(tag)
+    if more:
+        response.headers['X-Next-Cursor'] = encode_cursor(items[-1])
+    return response, 200
+
+def shared_top_scores(limit):
+    """Top scores for the body every worker serves from the shared cache.
+
+    With DynamoDB this merges the leaderboard index, which has every
+    worker's scores, with this worker's board, which also has its own
+    latest scores while the eventually consistent index catches up.
+    """
+    leaderboard.ensure_loaded()
+    items = leaderboard.top(limit)
+    if use_dynamodb:
+        try:
+            items = items + query_top_scores(limit)
+        except Exception as e:
+            logger.error(f"Error querying leaderboard index for the shared top scores: {str(e)}")
+    unique = {str(item.get('id')): item for item in items}
+    return sorted(unique.values(), key=leaderboard_key)[:limit]
+
 @app.route('/scores', methods=['GET'])
 def get_scores():
-    """Get high scores from the database"""
+    """Get high scores, served from the shared response cache when possible.
+
+    Optional query parameters: difficulty, control_mode, limit (up to
+    LEADERBOARD_SIZE) and cursor (from the X-Next-Cursor response header).
+    Filtered and paginated reads skip the shared cache.
+    """
     try:
         logger.info("Retrieving scores")
-        if use_dynamodb:
-            response = table.scan()
-            scores = response.get('Items', [])
+        if request.args:
+            return scores_page()
+        body, generation, tag = scores_cache.get()
+        if body is not None:
+            response = not_modified('scores', tag)
+            if response is not None:
+                return response
         else:
-            scores = memory_scores
-            
-        # Sort by score descending
-        scores.sort(key=lambda x: x.get('score', 0), reverse=True)
-        # Return top 10
-        return jsonify(scores[:10]), 200
+            top = shared_top_scores(10)
+            body = app.json.dumps([public_score(item) for item in top]).encode()
+            # Fewer than 10 entries means any new score changes the response
+            threshold = score_value(top[-1]) if len(top) >= 10 else float('-inf')
+            tag = scores_cache.put(body, threshold, generation)
+            conditional_stats.record('scores', bool(request.if_none_match), False)
+        response = Response(body, mimetype='application/json')
+        if tag is not None:
+            response.set_etag(tag)
+        return response, 200
     except Exception as e:
         logger.error(f"Error retrieving scores: {str(e)}")
         # Fallback to memory scores
-        memory_scores.sort(key=lambda x: x.get('score', 0), reverse=True)
-        return jsonify(memory_scores[:10]), 200
+        return jsonify(memory_scores.top(10)), 200
+
+# Optional write-behind persistence for DynamoDB score writes
+SCORE_WRITE_BEHIND = os.environ.get('SCORE_WRITE_BEHIND', 'false').lower() == 'true'
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('WRITE_BEHIND_BATCH_SIZE', 25))
+WRITE_BEHIND_INTERVAL = float(os.environ.get('WRITE_BEHIND_INTERVAL', 1.0))  # seconds
+WRITE_BEHIND_MAX_QUEUE = int(os.environ.get('WRITE_BEHIND_MAX_QUEUE', 10000))
+WRITE_BEHIND_RETRIES = int(os.environ.get('WRITE_BEHIND_RETRIES', 5))
+
+class ScoreWriteBehind:
+    """Background flusher that persists queued scores with DynamoDB batch writes.
+
+    A batch is flushed when it reaches WRITE_BEHIND_BATCH_SIZE items or
+    WRITE_BEHIND_INTERVAL seconds after its first item. batch_writer resends
+    unprocessed items; failed batches are retried with backoff and finally
+    kept in memory. The queue is drained on shutdown.
+    """
+    def __init__(self, batch_size=WRITE_BEHIND_BATCH_SIZE, interval=WRITE_BEHIND_INTERVAL,
+                 max_queue=WRITE_BEHIND_MAX_QUEUE, retries=WRITE_BEHIND_RETRIES):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.retries = retries
+        self.queue = queue.Queue(max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self.flushed = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='score-writer', daemon=True)
+            self._thread.start()
+            logger.info("Score write-behind enabled")
+
+    def enqueue(self, item):
+        """Queue an item; returns False when the queue is full"""
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            return False
+
+    def _collect(self):
+        batch = []
+        try:
+            batch.append(self.queue.get(timeout=self.interval))
+        except queue.Empty:
+            return batch
+        deadline = time.time() + self.interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.time()
+            if remaining <= 0 and self.queue.empty():
+                break
+            try:
+                batch.append(self.queue.get(timeout=max(remaining, 0)))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self.flush(batch)
+
+    def flush(self, batch):
+        start = time.perf_counter()
+        for attempt in range(self.retries):
+            try:
+                # Later writes of the same id replace earlier ones, as with put_item
+                with table.batch_writer(overwrite_by_pkeys=['id']) as writer:
+                    for item in batch:
+                        writer.put_item(Item=item)
+                elapsed = (time.perf_counter() - start) * 1000
+                self.flushed += len(batch)
+                # A rebuild between enqueue and now read the index without these scores
+                scores_cache.score_saved(max(score_value(item) for item in batch))
+                self.batches += 1
+                self.last_flush_ms = elapsed
+                self.max_flush_ms = max(self.max_flush_ms, elapsed)
+                self.total_flush_ms += elapsed
+                return True
+            except Exception as e:
+                logger.error(f"Error flushing {len(batch)} scores (attempt {attempt + 1}): {str(e)}")
+                time.sleep(min(0.1 * 2 ** attempt, 5))
+        self.failed += len(batch)
+        remember_scores(batch)
+        logger.info(f"Kept {len(batch)} unsaved scores in memory")
+        return False
+
+    def stop(self):
+        """Stop the flusher and write everything still queued"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        pending = []
+        while True:
+            try:
+                pending.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        for start in range(0, len(pending), self.batch_size):
+            self.flush(pending[start:start + self.batch_size])
+        if pending:
+            logger.info(f"Flushed {len(pending)} queued scores on shutdown")
+
+    def stats(self):
+        return {
+            'queue_depth': self.queue.qsize(),
+            'flushed': self.flushed,
+            'failed': self.failed,
+            'batches': self.batches,
+            'last_flush_ms': round(self.last_flush_ms, 3),
+            'mean_flush_ms': round(self.total_flush_ms / self.batches, 3) if self.batches else 0.0,
+            'max_flush_ms': round(self.max_flush_ms, 3)
+        }
+
+score_writer = ScoreWriteBehind()
+if SCORE_WRITE_BEHIND and use_dynamodb:
+    score_writer.start()
+    # Gunicorn workers exit through sys.exit on SIGTERM, which runs atexit handlers
+    atexit.register(score_writer.stop)
+
+# Limits for submitted scores; scores must stay exact in the float64 score columns
+MAX_SCORE = 2 ** 53 - 1
+MAX_LEVEL = 2 ** 31 - 1
+MAX_PLAYER_NAME = 64
+MAX_SCORE_LABEL = 16  # difficulty and control_mode
+MAX_SCORE_ID_LENGTH = 24  # the score log's id field
+
+def score_integer(data, name, default, minimum, maximum):
+    """An integer score field, given as a JSON number or numeric string; raises ValueError"""
+    value = data.get(name, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float, decimal.Decimal, str)):
+        raise ValueError(f'{name} must be an integer')
+    try:
+        number = decimal.Decimal(str(value).strip())
+    except decimal.InvalidOperation:
+        raise ValueError(f'{name} must be an integer')
+    if not number.is_finite() or number != number.to_integral_value():
+        raise ValueError(f'{name} must be an integer')
+    if not minimum <= number <= maximum:
+        raise ValueError(f'{name} must be between {minimum} and {maximum}')
+    return int(number)
+
+def score_text(data, name, default, limit):
+    value = data.get(name, default)
+    if not isinstance(value, str) or not value.strip() or len(value) > limit:
+        raise ValueError(f'{name} must be a non-empty string of at most {limit} characters')
+    return value.strip()
+
+def build_score_item(score_data, score_id=None, timestamp=None):
+    """Stored score from submitted fields; a new id and the current time unless given.
+
+    Raises ValueError for a field the leaderboard indexes or columns can't hold.
+    """
+    if not isinstance(score_data, dict):
+        raise ValueError('score must be a JSON object')
+    return {
+        'id': score_id or score_ids.next_id(),  # Time-sortable, unique per worker
+        'player_name': score_text(score_data, 'player_name', 'Anonymous', MAX_PLAYER_NAME),
+        'score': score_integer(score_data, 'score', 0, 0, MAX_SCORE),
+        'level': score_integer(score_data, 'level', 1, 1, MAX_LEVEL),
+        'difficulty': score_text(score_data, 'difficulty', 'easy', MAX_SCORE_LABEL),
+        'control_mode': score_text(score_data, 'control_mode', 'touch', MAX_SCORE_LABEL),
+        'timestamp': (score_integer({'timestamp': timestamp}, 'timestamp', 0, 0, 2 ** 63 - 1)
+                      if timestamp is not None else int(time.time()))
+    }
+
+def stored_score_item(score_item):
+    """DynamoDB item for a score, with its leaderboard index partition keys"""
+    # "score" is a numeric index key; Decimal is how boto3 writes an exact N
+    stored_item = dict(score_item, board=leaderboard_board(), score=decimal.Decimal(score_item['score']))
+    partition = score_partition(score_item)
+    if partition:
+        stored_item['partition'] = partition
+    return stored_item
+
+SCORE_ID_RETRIES = 3
+
+def put_new_score(score_item):
+    """Write a new score without overwriting another; returns the stored item.
+
+    An existing item with the same id means two workers shared a worker id,
+    so the score takes a fresh id (updating score_item) and is written again.
+    """
+    from botocore.exceptions import ClientError
+    for attempt in range(SCORE_ID_RETRIES):
+        stored_item = stored_score_item(score_item)
+        try:
+            table.put_item(Item=stored_item, ConditionExpression='attribute_not_exists(id)')
+            return stored_item
+        except ClientError as e:
+            if (e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException'
+                    or attempt == SCORE_ID_RETRIES - 1):
+                raise
+            score_ids.collisions += 1
+            logger.warning(f"Score id {score_item['id']} is already taken; retrying with a new id")
+            score_item['id'] = score_ids.next_id()
 
 @app.route('/scores', methods=['POST'])
 def save_score():
     """Save a new high score"""
     try:
-        score_data = request.json
-        score_item = {
-            'id': str(int(time.time())),  # Use timestamp as ID
-            'player_name': score_data.get('player_name', 'Anonymous'),
-            'score': score_data.get('score', 0),
-            'level': score_data.get('level', 1),
-            'difficulty': score_data.get('difficulty', 'easy'),
-            'control_mode': score_data.get('control_mode', 'touch'),
-            'timestamp': int(time.time())
-        }
+        try:
+            score_item = build_score_item(request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'error': f'Invalid score: {e}'}), 400
         logger.info(f"Saving score: {score_item}")
         
         # Try to save to DynamoDB if available
-        if use_dynamodb:
+        stored_item = stored_score_item(score_item)
+        if use_dynamodb and SCORE_WRITE_BEHIND and score_writer.enqueue(stored_item):
+            logger.info("Score queued for DynamoDB")
+        elif use_dynamodb:
             try:
-                table.put_item(Item=score_item)
+                put_new_score(score_item)
                 logger.info("Score saved to DynamoDB")
             except Exception as e:
                 logger.error(f"Error saving to DynamoDB: {str(e)}")
-                memory_scores.append(score_item)
+                remember_scores([score_item])
                 logger.info("Score saved to memory")
         else:
-            memory_scores.append(score_item)
+            remember_scores([score_item])
             logger.info("Score saved to memory (DynamoDB not available)")
-                
+
+        leaderboard.add(score_item)
+        scores_cache.score_saved(score_value(score_item))
         return jsonify(score_item), 201
     except Exception as e:
         logger.error(f"Error processing score submission: {str(e)}")
         return jsonify({'error': 'Failed to save score'}), 500
 
+# Bulk transfer: NDJSON export and import, one score object per line
+SCORES_ADMIN_TOKEN = os.environ.get('SCORES_ADMIN_TOKEN', '')
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 1000))
+
+class BulkTransferStats:
+    """Totals and last-run throughput for exports and imports"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.transfers = {}
+
+    def record(self, kind, records, seconds):
+        with self._lock:
+            totals = self.transfers.setdefault(kind, {'runs': 0, 'records': 0})
+            totals['runs'] += 1
+            totals['records'] += records
+            totals['last_records'] = records
+            totals['last_seconds'] = round(seconds, 3)
+            totals['last_records_per_second'] = round(records / seconds) if seconds > 0 else 0
+
+    def stats(self):
+        with self._lock:
+            return {kind: dict(totals) for kind, totals in self.transfers.items()}
+
+bulk_stats = BulkTransferStats()
+
+def admin_allowed():
+    """Bulk endpoints need SCORES_ADMIN_TOKEN in X-Admin-Token; without a token, local mode only"""
+    if SCORES_ADMIN_TOKEN:
+        return secrets.compare_digest(request.headers.get('X-Admin-Token', ''), SCORES_ADMIN_TOKEN)
+    return os.environ.get('ENVIRONMENT') == 'local'
+
+def plain_value(value):
+    # DynamoDB returns numbers as Decimal
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
+def public_score(item):
+    """A stored score as clients see it: plain numbers, no index keys"""
+    return {key: plain_value(value) for key, value in item.items() if key not in ('board', 'partition')}
+
+def export_items():
+    """Every stored score, one page or log chunk at a time.
+
+    With DynamoDB this is the table followed by the scores kept locally
+    because their writes failed. A failed batch may have been partly written,
+    so an id can appear twice; importing the export overwrites by id.
+    """
+    if use_dynamodb:
+        yield from scan_scores()
+    if score_log is not None:
+        yield from score_log.iter_items()
+    else:
+        yield from memory_scores.items()
+
+def export_lines():
+    start = time.perf_counter()
+    count = 0
+    try:
+        for item in export_items():
+            record = public_score(item)
+            yield json.dumps(record, separators=(',', ':')) + '\n'
+            count += 1
+    finally:
+        elapsed = time.perf_counter() - start
+        bulk_stats.record('export', count, elapsed)
+        logger.info(f"Exported {count} scores in {elapsed:.1f} s")
+
+@app.route('/scores/export', methods=['GET'])
+def export_scores():
+    """Stream every score as NDJSON"""
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    return Response(export_lines(), mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': 'attachment; filename=scores.ndjson'})
+
+def write_import_chunk(chunk):
+    if use_dynamodb:
+        # batch_writer sends 25-item BatchWriteItem calls and resends unprocessed items
+        with table.batch_writer(overwrite_by_pkeys=['id']) as writer:
+            for item in chunk:
+                writer.put_item(Item=stored_score_item(item))
+    else:
+        remember_scores(chunk)
+    # Highest score that made the leaderboard, for invalidating the cached top 10
+    best = float('-inf')
+    for item in chunk:
+        if leaderboard.add(item):
+            best = max(best, score_value(item))
+    return best
+
+def iter_body_lines(stream, chunk_size=1 << 16):
+    """Split a request body into lines, reading it in fixed-size chunks"""
+    # Iterating the WSGI input directly reads one byte per call
+    pending = b''
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+def imported_score_id(data):
+    """The id of an imported score, or None to assign a new one; raises ValueError"""
+    score_id = data.get('id')
+    if score_id is None:
+        return None
+    if (isinstance(score_id, bool) or not isinstance(score_id, (str, int))
+            or not 0 < len(str(score_id).strip()) <= MAX_SCORE_ID_LENGTH):
+        raise ValueError(f'id must be a string of at most {MAX_SCORE_ID_LENGTH} characters')
+    return str(score_id).strip()
+
+@app.route('/scores/import', methods=['POST'])
+def import_scores():
+    """Load NDJSON scores from the request body in batches.
+
+    Each line is a score object as produced by /scores/export; ids and
+    timestamps are kept when present. The body is read line by line and
+    written IMPORT_CHUNK_SIZE items at a time, so memory use does not depend
+    on its size. Lines that are not valid scores are skipped and counted.
+    """
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    start = time.perf_counter()
+    imported = skipped = 0
+    first_error = None
+    best = float('-inf')
+    chunk = []
+    try:
+        for number, line in enumerate(iter_body_lines(request.stream), 1):
+            if not line.strip():
+                continue
+            try:
+                # Decimal parses numbers exactly, so 1e3 and 1000.0 validate as integers
+                data = json.loads(line, parse_float=decimal.Decimal)
+                if not isinstance(data, dict):
+                    raise ValueError('not an object')
+                chunk.append(build_score_item(data, score_id=imported_score_id(data),
+                                              timestamp=data.get('timestamp')))
+            except ValueError as e:
+                skipped += 1
+                first_error = first_error or f"line {number}: {str(e)}"
+                continue
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                best = max(best, write_import_chunk(chunk))
+                imported += len(chunk)
+                chunk = []
+        if chunk:
+            best = max(best, write_import_chunk(chunk))
+            imported += len(chunk)
+    except Exception as e:
+        logger.error(f"Error importing scores after {imported} records: {str(e)}")
+        return jsonify({'error': 'Import failed', 'imported': imported}), 500
+    finally:
+        # Even a failed import may have written some chunks
+        scores_cache.score_saved(best)
+    elapsed = time.perf_counter() - start
+    bulk_stats.record('import', imported, elapsed)
+    logger.info(f"Imported {imported} scores in {elapsed:.1f} s, skipped {skipped}")
+    return jsonify({
+        'imported': imported,
+        'skipped': skipped,
+        'first_error': first_error,
+        'seconds': round(elapsed, 3),
+        'records_per_second': round(imported / elapsed) if elapsed > 0 else 0
+    }), 200
+
+def backfill_updates(item):
+    """Index attributes a stored score is missing, as {name: value}.
+
+    Raises ValueError for a score that can't be an index key.
+    """
+    score = score_integer(item, 'score', None, 0, MAX_SCORE)
+    updates = {}
+    if not isinstance(item.get('score'), decimal.Decimal):
+        updates['score'] = decimal.Decimal(score)
+    if 'board' not in item:
+        updates['board'] = leaderboard_board()
+    partition = score_partition(item)
+    if partition and item.get('partition') != partition:
+        updates['partition'] = partition
+    return updates
+
+@app.route('/scores/backfill', methods=['POST'])
+def backfill_scores():
+    """Add board/partition keys (and numeric scores) to items written before the indexes.
+
+    Scans the whole table and updates only items that need it, so it is safe
+    to run again. Items whose score is not a valid integer are left alone
+    and counted.
+    """
+    if not admin_allowed():
+        return jsonify({'error': 'Forbidden'}), 403
+    if not use_dynamodb:
+        return jsonify({'error': 'Backfill needs DynamoDB'}), 400
+    from botocore.exceptions import ClientError
+    start = time.perf_counter()
+    scanned = updated = invalid = 0
+    first_error = None
+    try:
+        for item in scan_scores():
+            scanned += 1
+            try:
+                updates = backfill_updates(item)
+            except ValueError as e:
+                invalid += 1
+                first_error = first_error or f"id {item.get('id')}: {str(e)}"
+                continue
+            if not updates:
+                continue
+            names = {f'#a{i}': name for i, name in enumerate(updates)}
+            values = {f':v{i}': value for i, value in enumerate(updates.values())}
+            try:
+                table.update_item(
+                    Key={'id': item['id']},
+                    UpdateExpression='SET ' + ', '.join(f'#a{i} = :v{i}' for i in range(len(updates))),
+                    ConditionExpression='attribute_exists(id)',  # don't resurrect deleted scores
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues=values)
+                updated += 1
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'ConditionalCheckFailedException':
+                    raise
+    except Exception as e:
+        logger.error(f"Error backfilling scores after {scanned} items: {str(e)}")
+        return jsonify({'error': 'Backfill failed', 'scanned': scanned, 'updated': updated}), 500
+    elapsed = time.perf_counter() - start
+    logger.info(f"Backfilled {updated} of {scanned} scores, {invalid} invalid")
+    return jsonify({
+        'scanned': scanned,
+        'updated': updated,
+        'invalid': invalid,
+        'first_error': first_error,
+        'seconds': round(elapsed, 3)
+    }), 200
+
+@app.route('/scores/recent', methods=['GET'])
+def recent_scores():
+    """Newest scores first; ?before=<id> pages back through older ids"""
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), LEADERBOARD_SIZE)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    # Ids are zero-padded and time-ordered, so "before" is a plain key range; the default
+    # upper bound also leaves out legacy ids, which were unpadded Unix seconds
+    before = request.args.get('before') or score_id_floor(time.time() + 60)
+    try:
+        items = query_recent_scores(limit, before) if use_dynamodb else []
+    except Exception as e:
+        logger.error(f"Error querying recent scores: {str(e)}")
+        items = []
+    if len(items) < limit:
+        seen = {item['id'] for item in items}
+        items += [item for item in memory_scores.newest(limit, before) if item['id'] not in seen]
+        items = heapq.nlargest(limit, items, key=lambda item: item['id'])
+    response = jsonify([public_score(item) for item in items])
+    if len(items) == limit:
+        response.headers['X-Next-Cursor'] = items[-1]['id']
+    return response, 200
+
+@app.route('/scores/stats', methods=['GET'])
+def score_stats():
+    """Leaderboard cache, local score storage and score writer statistics for this worker"""
+    return jsonify({
+        'cache': scores_cache.stats(),
+        'conditional': conditional_stats.stats('scores'),
+        'ids': {'worker': score_ids.worker, 'generated': score_ids.generated,
+                'sequence_waits': score_ids.sequence_waits, 'collisions': score_ids.collisions},
+        'memory_store': memory_scores.stats(),
+        'bulk': bulk_stats.stats(),
+        'score_log': score_log.stats() if score_log is not None else None,
+        'write_behind': score_writer.stats() if SCORE_WRITE_BEHIND else None
+    }), 200
+
 # Game API endpoints
 @app.route('/game/start', methods=['POST'])
 def start_game():
     """Start a new game"""
-    global game_state
     try:
-        game_state = GameState()
+        token, state = game_registry.create(session_token())
         logger.info("New game started")
-        return jsonify(game_state.to_dict()), 200
+        with state.lock:
+            response = state_response(state.to_dict(), state.tick)
+        response.headers[SESSION_HEADER] = token
+        response.set_cookie(SESSION_COOKIE, token, max_age=GAME_SESSION_TTL, httponly=True, samesite='Lax')
+        return response, 200
     except Exception as e:
         logger.error(f"Error starting game: {str(e)}")
         return jsonify({'error': 'Failed to start game'}), 500
@@ -2188,10 +3111,27 @@ def start_game():
 @app.route('/game/status', methods=['GET'])
 def game_status():
     """Get current game state"""
-    global game_state
     try:
-        game_state.update()
-        return jsonify(game_state.to_dict()), 200
+        game_state = current_game()
+        if game_state is None:
+            return unknown_session()
+        since = request.args.get('since', type=int)
+        with game_state.lock:
+            if not tick_scheduler.running:
+                game_state.advance()
+            # The URL selects full or delta; the ETag also has to tell the encodings apart
+            tag = f"{game_state.game_id}.{game_state.version}.{'b' if wants_binary() else 'j'}"
+            response = not_modified('game_status', tag)
+            if response is None:
+                if since is None and 'since' not in request.args:
+                    response = state_response(game_state.to_dict(), game_state.tick)
+                else:
+                    response = state_response(game_state.snapshot(since, request.args.get('game')))
+                response.set_etag(tag)
+            response.headers['Vary'] = 'Accept'
+            response.headers['X-Game-Id'] = game_state.game_id
+            response.headers['X-Game-Tick'] = str(game_state.tick)
+            return response
     except Exception as e:
         logger.error(f"Error getting game status: {str(e)}")
         return jsonify({'error': 'Failed to get game status'}), 500
@@ -2199,14 +3139,14 @@ def game_status():
 @app.route('/game/move', methods=['POST'])
 def move_player():
     """Move the player"""
-    global game_state
     try:
+        game_state = current_game()
+        if game_state is None:
+            return unknown_session()
         direction = request.json.get('direction', 'right')
         
-        if direction == 'left' and game_state.player_x > 20:
-            game_state.player_x -= PLAYER_SPEED
-        elif direction == 'right' and game_state.player_x < SCREEN_WIDTH - 20:
-            game_state.player_x += PLAYER_SPEED
+        with game_state.lock:
+            game_state.move(direction)
             
         return jsonify({'success': True}), 200
     except Exception as e:
@@ -2216,13 +3156,159 @@ def move_player():
 @app.route('/game/shoot', methods=['POST'])
 def shoot():
     """Fire a bullet"""
-    global game_state
     try:
-        game_state.bullets.append([game_state.player_x, game_state.player_y])
+        game_state = current_game()
+        if game_state is None:
+            return unknown_session()
+        with game_state.lock:
+            game_state.shoot()
         return jsonify({'success': True}), 200
     except Exception as e:
         logger.error(f"Error shooting: {str(e)}")
         return jsonify({'error': 'Failed to shoot'}), 500
 
+@app.route('/game/input', methods=['POST'])
+def queue_input():
+    """Queue a batch of tick-stamped player commands"""
+    try:
+        game_state = current_game()
+        if game_state is None:
+            return unknown_session()
+        data = request.get_json(silent=True)
+        commands = data.get('commands', []) if isinstance(data, dict) else data
+        if not isinstance(commands, list):
+            return jsonify({'error': 'commands must be a list'}), 400
+        try:
+            with game_state.lock:
+                accepted, dropped = game_state.queue_inputs(commands)
+                tick = game_state.tick
+        except ValueError as e:
+            return jsonify({'error': f'Invalid command: {e}'}), 400
+        return jsonify({'accepted': accepted, 'dropped': dropped, 'tick': tick}), 202
+    except Exception as e:
+        logger.error(f"Error queueing input: {str(e)}")
+        return jsonify({'error': 'Failed to queue input'}), 500
+
+@app.route('/game/step', methods=['POST'])
+def step_game():
+    """Advance the game several ticks in one call"""
+    try:
+        game_state = current_game()
+        if game_state is None:
+            return unknown_session()
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Body must be a JSON object'}), 400
+        ticks = data.get('ticks', 1)
+        inputs = data.get('inputs', [])
+        if isinstance(ticks, bool) or not isinstance(ticks, int) or not 1 <= ticks <= MAX_STEP_TICKS:
+            return jsonify({'error': f'ticks must be an integer between 1 and {MAX_STEP_TICKS}'}), 400
+        if not isinstance(inputs, list):
+            return jsonify({'error': 'inputs must be a list'}), 400
+        with game_state.lock:
+            try:
+                events = game_state.step(ticks, inputs)
+            except ValueError as e:
+                return jsonify({'error': f'Invalid input: {e}'}), 400
+            if wants_binary():
+                response = state_response(game_state.to_dict(), game_state.tick)
+                response.headers['X-Game-Events'] = json.dumps(events)
+                return response, 200
+            return jsonify({'state': game_state.to_dict(), 'events': events}), 200
+    except Exception as e:
+        logger.error(f"Error stepping game: {str(e)}")
+        return jsonify({'error': 'Failed to step game'}), 500
+
+@app.route('/game/stream', methods=['GET'])
+def stream_game():
+    """Server-Sent Events feed of game state deltas at the server tick rate"""
+    token = session_token()
+    if game_registry.get(token) is None:
+        return unknown_session()
+    # Resume from the last event the browser saw ("<game id>:<tick>")
+    since, game_id = None, None
+    last_event = request.headers.get('Last-Event-ID', '')
+    if ':' in last_event:
+        game_id, _, tick = last_event.partition(':')
+        since = int(tick) if tick.isdigit() else None
+
+    def events():
+        stream_stats.connect()
+        last_write = time.monotonic()
+        try:
+            for snapshot in game_updates(token, since, game_id):
+                if snapshot is None:
+                    # Only write when proxies might otherwise time out the idle connection
+                    if time.monotonic() - last_write >= STREAM_KEEPALIVE_INTERVAL:
+                        last_write = time.monotonic()
+                        yield ': keepalive\n\n'
+                    continue
+                stream_stats.sent()
+                last_write = time.monotonic()
+                yield f"id: {snapshot['game_id']}:{snapshot['tick']}\ndata: {json.dumps(snapshot)}\n\n"
+        finally:
+            stream_stats.disconnect()
+
+    response = Response(events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def game_socket(ws):
+    """WebSocket channel: pushes state deltas each tick and accepts player input.
+
+    Inputs are JSON messages like {"tick": 120, "action": "left"} (or a list
+    of them) and go on the session's input queue like /game/input. Send
+    ?format=binary for binary frames.
+    """
+    token = session_token()
+    if game_registry.get(token) is None:
+        ws.close(reason=1008, message='Unknown or expired game session')
+        return
+    binary = request.args.get('format') == 'binary'
+    stream_stats.connect()
+    try:
+        for snapshot in game_updates(token):
+            while True:
+                message = ws.receive(timeout=0)
+                if message is None:
+                    break
+                state = game_registry.get(token)
+                if state is None:
+                    break
+                try:
+                    commands = json.loads(message)
+                    with state.lock:
+                        state.queue_inputs(commands if isinstance(commands, list) else [commands])
+                except ValueError as e:
+                    ws.send(json.dumps({'error': f'Invalid command: {e}'}))
+            if snapshot is None:
+                continue
+            stream_stats.sent()
+            ws.send(encode_state(snapshot) if binary else json.dumps(snapshot))
+    except Exception as e:
+        logger.info(f"Game socket closed: {str(e)}")
+    finally:
+        stream_stats.disconnect()
+
+if sock is not None:
+    sock.route('/game/ws')(game_socket)
+
+@app.route('/game/stats', methods=['GET'])
+def game_stats():
+    """Session registry, tick loop, stream and conditional GET statistics"""
+    try:
+        return jsonify({
+            'sessions': game_registry.stats(),
+            'ticks': tick_scheduler.stats(),
+            'streams': stream_stats.stats(),
+            'conditional': conditional_stats.stats('game_status')
+        }), 200
+    except Exception as e:
+        logger.error(f"Error getting game stats: {str(e)}")
+        return jsonify({'error': 'Failed to get game stats'}), 500
+
 if __name__ == '__main__':
+    # Exit cleanly on SIGTERM so queued scores are flushed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 8082)))
@@ -0,0 +1,79 @@
+"""Stream generated scores through /scores/import, then read them back from /scores/export.
+
+Usage: python benchmarks/bulk_transfer_benchmark.py [--url URL] [--records N] [--admin-token TOKEN]
+
+Runs against a server started separately (e.g. ENVIRONMENT=local gunicorn app:app,
+optionally with DYNAMODB_ENDPOINT pointing at DynamoDB Local). The upload is
+generated on the fly and sent with chunked transfer encoding, and the export
+is counted as it streams, so neither side holds the data set in memory. Reports
+records per second for each direction; watch the server's RSS while it runs
+to confirm its memory stays flat.
+"""
+import argparse
+import http.client
+import json
+import resource
+import time
+from urllib.parse import urlparse
+
+def generate(count):
+    for i in range(count):
+        yield (json.dumps({
+            'player_name': f"player{i % 5000}",
+            'score': (i * 7919) % 1000003,
+            'level': 1 + i % 20,
+            'difficulty': ('easy', 'medium', 'hard')[i % 3],
+            'control_mode': ('touch', 'keyboard', 'mouse')[i % 3]
+        }) + '\n').encode()
+
+def batched(lines, size=1 << 16):
+    # Send ~64 KiB chunks rather than one chunk per line
+    buffer = []
+    length = 0
+    for line in lines:
+        buffer.append(line)
+        length += len(line)
+        if length >= size:
+            yield b''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+def connect(url):
+    parsed = urlparse(url)
+    return http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=3600)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost:8082')
+    parser.add_argument('--records', type=int, default=1000000)
+    parser.add_argument('--admin-token', default='')
+    args = parser.parse_args()
+    headers = {'X-Admin-Token': args.admin_token} if args.admin_token else {}
+
+    conn = connect(args.url)
+    start = time.perf_counter()
+    conn.request('POST', '/scores/import', body=batched(generate(args.records)), encode_chunked=True,
+                 headers=dict(headers, **{'Content-Type': 'application/x-ndjson'}))
+    response = conn.getresponse()
+    result = json.loads(response.read())
+    elapsed = time.perf_counter() - start
+    print(f"import: {result} ({args.records / elapsed:,.0f} records/s as seen by the client)")
+
+    conn = connect(args.url)
+    start = time.perf_counter()
+    conn.request('GET', '/scores/export', headers=headers)
+    response = conn.getresponse()
+    lines = 0
+    while True:
+        chunk = response.read(1 << 16)
+        if not chunk:
+            break
+        lines += chunk.count(b'\n')
+    elapsed = time.perf_counter() - start
+    print(f"export: {lines} records in {elapsed:.1f} s ({lines / elapsed:,.0f} records/s)")
+    # ru_maxrss is in KiB on Linux
+    print(f"client peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark the list and NumPy game engines.
+
+Usage: python benchmarks/engine_benchmark.py [--ticks N] [--list-limit N]
+
+Each run fills a game with the given number of entities (half bullets, half
+enemies at random positions), checks that both engines produce identical
+to_dict() output, then times update() per tick.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault('ENVIRONMENT', 'local')
+os.environ.setdefault('GAME_TICK_RATE', '0')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+import app
+
+logging.getLogger().setLevel(logging.WARNING)
+
+SIZES = [10, 1000, 100000]
+
+def populate(state, entities, seed):
+    rng = np.random.RandomState(seed)
+    bullets = entities // 2
+    for x, y in zip(rng.randint(0, app.SCREEN_WIDTH, bullets).tolist(),
+                    rng.randint(0, app.SCREEN_HEIGHT, bullets).tolist()):
+        state.add_bullet(x, y)
+    enemies = entities - bullets
+    types = rng.randint(0, len(app.ENEMY_TYPES), enemies).tolist()
+    for x, y, t in zip(rng.randint(0, app.SCREEN_WIDTH, enemies).tolist(),
+                       rng.randint(0, app.SCREEN_HEIGHT, enemies).tolist(), types):
+        state.add_enemy(x, y, app.ENEMY_TYPES[t])
+    # Keep the player alive so every tick does the full amount of work
+    state.player_health = 10 ** 9
+    return state
+
+def run(engine, entities, ticks, seed=1):
+    state = populate(engine(), entities, seed)
+    np.random.seed(seed)
+    timings = []
+    for _ in range(ticks):
+        start = time.perf_counter()
+        state.update()
+        timings.append(time.perf_counter() - start)
+    return state, timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=20)
+    parser.add_argument('--list-limit', type=int, default=5000,
+                        help='skip the list engine above this many entities')
+    args = parser.parse_args()
+    app.MAX_ENEMIES = max(SIZES)
+
+    print(f"{'entities':>10} {'engine':>7} {'mean ms/tick':>13} {'max ms/tick':>12} {'speedup':>8}")
+    for entities in SIZES:
+        results = {}
+        for name, engine in (('list', app.GameState), ('array', app.ArrayGameState)):
+            if name == 'list' and entities > args.list_limit:
+                print(f"{entities:>10} {name:>7} {'skipped (--list-limit)':>13}")
+                continue
+            results[name] = run(engine, entities, args.ticks)
+        if len(results) == 2:
+            assert results['list'][0].to_dict() == results['array'][0].to_dict(), 'engines diverged'
+        base = np.mean(results['list'][1]) if 'list' in results else None
+        for name, (_, timings) in results.items():
+            mean = np.mean(timings)
+            speedup = f"{base / mean:.1f}x" if base else '-'
+            print(f"{entities:>10} {name:>7} {mean * 1000:>13.3f} {max(timings) * 1000:>12.3f} {speedup:>8}")
+
+if __name__ == '__main__':
+    main()
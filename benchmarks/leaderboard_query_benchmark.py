@@ -0,0 +1,130 @@
+"""Leaderboard read cost as the score table grows: index Query vs. full Scan.
+
+Usage: python benchmarks/leaderboard_query_benchmark.py [--endpoint-url URL] [--sizes N ...]
+
+Runs against a local DynamoDB stand-in, for example DynamoDB Local:
+
+    docker run -p 8000:8000 amazon/dynamodb-local
+
+Creates a scratch table with the same keys and leaderboard index as
+cloudformation/database.yaml, grows it through the given sizes, and at each
+size reports consumed read units and latency for the app's top-10 query
+(query_top_scores) and for the old full-table scan.
+"""
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+os.environ.setdefault('ENVIRONMENT', 'local')
+os.environ.setdefault('GAME_TICK_RATE', '0')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import boto3
+from boto3.dynamodb.conditions import Key
+import app
+
+logging.getLogger().setLevel(logging.WARNING)
+
+def create_table(dynamodb, name):
+    table = dynamodb.create_table(
+        TableName=name,
+        BillingMode='PAY_PER_REQUEST',
+        AttributeDefinitions=[
+            {'AttributeName': 'id', 'AttributeType': 'S'},
+            {'AttributeName': 'board', 'AttributeType': 'S'},
+            {'AttributeName': 'score', 'AttributeType': 'N'}
+        ],
+        KeySchema=[{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        GlobalSecondaryIndexes=[{
+            'IndexName': app.LEADERBOARD_INDEX,
+            'KeySchema': [
+                {'AttributeName': 'board', 'KeyType': 'HASH'},
+                {'AttributeName': 'score', 'KeyType': 'RANGE'}
+            ],
+            'Projection': {'ProjectionType': 'ALL'}
+        }]
+    )
+    table.wait_until_exists()
+    return table
+
+def fill(table, start, stop):
+    with table.batch_writer() as batch:
+        for i in range(start, stop):
+            batch.put_item(Item={
+                'id': str(i),
+                'board': app.leaderboard_board(),
+                'player_name': f'player{i}',
+                'score': random.randint(0, 1000000),
+                'level': random.randint(1, 20),
+                'difficulty': random.choice(['easy', 'medium', 'hard']),
+                'control_mode': random.choice(['touch', 'keyboard', 'mouse']),
+                'timestamp': int(time.time())
+            })
+
+def measure(read, repeat):
+    """Median latency and read units of one read"""
+    latencies, units = [], 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        units = read()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000, units
+
+def query_read(table):
+    units = 0.0
+    for shard in range(app.LEADERBOARD_SHARDS):
+        response = table.query(
+            IndexName=app.LEADERBOARD_INDEX,
+            KeyConditionExpression=Key('board').eq(app.leaderboard_board(shard)),
+            ScanIndexForward=False, Limit=10, ReturnConsumedCapacity='TOTAL')
+        units += response['ConsumedCapacity']['CapacityUnits']
+    return units
+
+def scan_read(table):
+    units, kwargs = 0.0, {}
+    while True:
+        response = table.scan(ReturnConsumedCapacity='TOTAL', **kwargs)
+        units += response['ConsumedCapacity']['CapacityUnits']
+        if 'LastEvaluatedKey' not in response:
+            return units
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--endpoint-url', default=os.environ.get('DYNAMODB_ENDPOINT', 'http://localhost:8000'))
+    parser.add_argument('--region', default='us-east-1')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scan-limit', type=int, default=100000,
+                        help='skip the full scan above this many items')
+    args = parser.parse_args()
+
+    dynamodb = boto3.resource('dynamodb', endpoint_url=args.endpoint_url, region_name=args.region,
+                              aws_access_key_id='local', aws_secret_access_key='local')
+    table = create_table(dynamodb, f'leaderboard-bench-{uuid.uuid4().hex[:8]}')
+    app.table = table
+    try:
+        print(f"{'items':>9} {'query RCU':>10} {'query ms':>9} {'scan RCU':>10} {'scan ms':>9}")
+        loaded = 0
+        for size in args.sizes:
+            fill(table, loaded, size)
+            loaded = size
+            top = app.query_top_scores(10)
+            assert [app.score_value(i) for i in top] == sorted((app.score_value(i) for i in top), reverse=True)
+            query_ms, query_units = measure(lambda: query_read(table), args.repeat)
+            if size <= args.scan_limit:
+                scan_ms, scan_units = measure(lambda: scan_read(table), 1)
+                scan = f"{scan_units:>10.1f} {scan_ms:>9.1f}"
+            else:
+                scan = f"{'skipped':>10} {'-':>9}"
+            print(f"{size:>9} {query_units:>10.1f} {query_ms:>9.1f} {scan}")
+    finally:
+        table.delete()
+
+if __name__ == '__main__':
+    main()
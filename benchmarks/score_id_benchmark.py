@@ -0,0 +1,78 @@
+"""Measure score id generation throughput across threads and worker processes.
+
+Usage: python benchmarks/score_id_benchmark.py [--ids N] [--threads N ...] [--workers N ...]
+
+Threads share one ScoreIdGenerator, as request threads in a worker do.
+Worker processes each get their own generator and worker id, as gunicorn
+workers and ECS tasks do. Every run checks that all ids are unique and that
+each thread's ids strictly increase.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault('ENVIRONMENT', 'local')
+os.environ.setdefault('GAME_TICK_RATE', '0')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app
+
+logging.getLogger().setLevel(logging.WARNING)
+
+def generate(generator, count, out):
+    ids = [generator.next_id() for _ in range(count)]
+    assert all(a < b for a, b in zip(ids, ids[1:])), "ids from one thread must increase"
+    out.extend(ids)
+
+def run_threads(threads, count):
+    generator = app.ScoreIdGenerator(worker=1)
+    results = [[] for _ in range(threads)]
+    workers = [threading.Thread(target=generate, args=(generator, count, results[i])) for i in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+    ids = [score_id for result in results for score_id in result]
+    return len(ids), len(set(ids)), elapsed, generator.sequence_waits
+
+def worker_process(worker, count, queue):
+    ids = []
+    start = time.perf_counter()
+    generate(app.ScoreIdGenerator(worker=worker), count, ids)
+    queue.put((ids, time.perf_counter() - start))
+
+def run_workers(workers, count):
+    queue = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=worker_process, args=(worker, count, queue))
+                 for worker in range(workers)]
+    for process in processes:
+        process.start()
+    results = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    ids = [score_id for result, _ in results for score_id in result]
+    # Workers run concurrently; the slowest one bounds the aggregate rate
+    return len(ids), len(set(ids)), max(elapsed for _, elapsed in results), 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ids', type=int, default=200000, help='ids per thread or worker')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    print(f"{'mode':>8} {'n':>3} {'ids':>9} {'unique':>9} {'ids/s':>12} {'seq waits':>10}")
+    runs = [('threads', n, run_threads) for n in args.threads] + [('workers', n, run_workers) for n in args.workers]
+    for mode, n, run in runs:
+        total, unique, elapsed, waits = run(n, args.ids)
+        print(f"{mode:>8} {n:>3} {total:>9} {unique:>9} {total / elapsed:>12,.0f} {waits:>10}")
+        assert unique == total, "duplicate ids"
+
+if __name__ == '__main__':
+    main()
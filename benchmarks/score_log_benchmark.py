@@ -0,0 +1,67 @@
+"""Measure score log replay and compaction throughput.
+
+Usage: python benchmarks/score_log_benchmark.py [--records N ...] [--path FILE]
+
+Writes a log of N random scores, then times a cold replay into a fresh
+MemoryScoreStore and a compaction down to the retained set.
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('ENVIRONMENT', 'local')
+os.environ.setdefault('GAME_TICK_RATE', '0')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+import app
+
+logging.getLogger().setLevel(logging.WARNING)
+
+def write_log(path, count, seed=1):
+    """Write count records directly, in chunks, without going through append()"""
+    rng = np.random.default_rng(seed)
+    now = int(time.time())
+    with open(path, 'wb') as f:
+        f.write(app.SCORE_LOG_HEADER.pack(app.SCORE_LOG_MAGIC, app.SCORE_LOG_VERSION,
+                                          app.SCORE_LOG_RECORD.itemsize))
+        for start in range(0, count, 100000):
+            n = min(100000, count - start)
+            records = np.zeros(n, dtype=app.SCORE_LOG_RECORD)
+            records['id'] = np.char.encode(np.arange(start, start + n).astype(str))
+            records['score'] = rng.integers(0, 1000000, n)
+            records['level'] = rng.integers(1, 20, n)
+            records['timestamp'] = now - count + start + np.arange(n)
+            records['player_name'] = np.char.encode(np.char.add('player', (np.arange(n) % 5000).astype(str)))
+            records['difficulty'] = b'easy'
+            records['control_mode'] = b'touch'
+            f.write(records.tobytes())
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--path', default=os.path.join(tempfile.gettempdir(), 'score_log_benchmark.log'))
+    args = parser.parse_args()
+
+    print(f"{'records':>9} {'MiB':>8} {'replay ms':>10} {'records/s':>12} {'compact ms':>11} {'kept':>7}")
+    for count in args.records:
+        write_log(args.path, count)
+        size = os.path.getsize(args.path)
+        store = app.MemoryScoreStore()
+        log = app.ScoreLog(args.path, store, compact_ratio=0)
+        start = time.perf_counter()
+        log.replay()
+        replay = time.perf_counter() - start
+        start = time.perf_counter()
+        log.compact()
+        compact = time.perf_counter() - start
+        log.close()
+        print(f"{count:>9} {size / 2 ** 20:>8.1f} {replay * 1000:>10.1f} {count / replay:>12,.0f} "
+              f"{compact * 1000:>11.1f} {log.records:>7}")
+    os.remove(args.path)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""Compare gunicorn worker modes by concurrent players against request latency.
+
+Usage: python benchmarks/serving_benchmark.py [--modes gthread gevent] [--players N ...]
+       [--duration S] [--interval S] [--streaming F] [--server-cpus 0 ...] [--client-cpus 1 ...]
+
+For each mode and player count a fresh server is started with gunicorn.conf.py
+and pinned to the same CPUs, so every mode gets equal CPU. The load generator
+runs on the other CPUs unless --client-cpus says otherwise. If it has to share
+a CPU with the server, a warning is printed: its own work then shows up in the
+latencies, so results only compare with runs on the same layout. Each
+simulated player starts a game, then every --interval seconds sends the
+browser's polling requests on its own keep-alive connection: GET /game/status,
+POST /game/move and POST /game/shoot. The status request's latency is measured
+from the time the poll was due, so a player that fell behind a busy server
+counts the delay. Requests slower than --timeout count as errors. --streaming
+gives that fraction of players an open /game/stream as well, like live browser
+clients. Prints p50/p99 latency and request rate per mode side by side.
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import argparse
+import http.client
+import json
+import os
+import subprocess
+import sys
+import time
+
+import gevent
+import numpy as np
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+def start_server(mode, port, cpus, threads, tick_rate):
+    env = dict(os.environ, ENVIRONMENT='local', WORKER_MODE=mode, PORT=str(port), THREADS=str(threads),
+               WEB_CONCURRENCY='1', GAME_TICK_RATE=str(tick_rate))
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', '--log-level', 'warning', 'app:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        preexec_fn=(lambda: os.sched_setaffinity(0, cpus)) if cpus else None)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+def stream(port, session, until):
+    """Hold a /game/stream subscription open and read it until the run ends"""
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    try:
+        connection.request('GET', '/game/stream', headers=session)
+        response = connection.getresponse()
+        while time.time() < until and response.readline():
+            pass
+    except (OSError, http.client.HTTPException):
+        pass
+    finally:
+        connection.close()
+
+def player(port, interval, until, timeout, streaming, latencies, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+
+    def call(method, path, body=None, headers=None, due=None):
+        nonlocal connection
+        due = due or time.perf_counter()
+        try:
+            connection.request(method, path, body=body, headers=headers or {})
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+                return None
+            latencies.append(time.perf_counter() - due)
+            return response
+        except (OSError, http.client.HTTPException):
+            errors.append(0)
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=timeout)
+            return None
+
+    response = call('POST', '/game/start')
+    if response is None:
+        return
+    session = {'X-Game-Session': response.getheader('X-Game-Session'), 'Content-Type': 'application/json'}
+    move = json.dumps({'direction': 'left'})
+    if streaming:
+        gevent.spawn(stream, port, session, until)
+    # Stagger players across the first interval so they don't all poll in lockstep
+    next_due = time.perf_counter() + np.random.uniform(0, interval)
+    while time.time() < until:
+        gevent.sleep(max(0, next_due - time.perf_counter()))
+        call('GET', '/game/status', headers=session, due=next_due)
+        call('POST', '/game/move', body=move, headers=session)
+        call('POST', '/game/shoot', body='{}', headers=session)
+        next_due += interval
+    connection.close()
+
+def run(mode, players, args, port):
+    server = start_server(mode, port, args.server_cpus, args.threads, args.tick_rate)
+    try:
+        latencies, errors = [], []
+        until = time.time() + args.warmup + args.duration
+        streaming = int(players * args.streaming)
+        greenlets = [gevent.spawn(player, port, args.interval, until, args.timeout, i < streaming,
+                                  latencies, errors)
+                     for i in range(players)]
+        gevent.sleep(args.warmup)
+        # Only keep what completed after the warm-up (connection setup, first games)
+        del latencies[:], errors[:]
+        gevent.joinall(greenlets, timeout=args.duration + args.timeout + 5)
+        gevent.killall(greenlets)
+        samples = np.array(latencies) * 1000
+        return {
+            'p50': float(np.percentile(samples, 50)) if len(samples) else float('nan'),
+            'p99': float(np.percentile(samples, 99)) if len(samples) else float('nan'),
+            'rps': len(samples) / args.duration,
+            'errors': len(errors)
+        }
+    finally:
+        server.terminate()
+        try:
+            server.wait(10)
+        except subprocess.TimeoutExpired:
+            server.kill()  # open streams can hold up a graceful shutdown
+            server.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', nargs='+', default=['gthread', 'gevent'])
+    parser.add_argument('--players', type=int, nargs='+', default=[10, 50, 100, 200, 400])
+    parser.add_argument('--duration', type=float, default=10.0, help='measured seconds per run')
+    parser.add_argument('--warmup', type=float, default=2.0)
+    parser.add_argument('--interval', type=float, default=0.25, help='seconds between a player\'s polls')
+    parser.add_argument('--streaming', type=float, default=0.0, help='fraction of players also holding /game/stream')
+    parser.add_argument('--timeout', type=float, default=5.0)
+    parser.add_argument('--threads', type=int, default=8, help='gthread pool size')
+    parser.add_argument('--tick-rate', type=float, default=30)
+    parser.add_argument('--server-cpus', type=int, nargs='*', default=[0])
+    parser.add_argument('--client-cpus', type=int, nargs='*', help='default: every CPU not in --server-cpus')
+    parser.add_argument('--port', type=int, default=8190)
+    args = parser.parse_args()
+    available = os.sched_getaffinity(0)
+    server_cpus = set(args.server_cpus) or available
+    client_cpus = set(args.client_cpus) if args.client_cpus else available - server_cpus
+    if not client_cpus or client_cpus & server_cpus:
+        print(f"warning: the client shares CPUs {sorted(client_cpus & server_cpus or server_cpus)} with "
+              f"the server, so latencies include the load generator's own work", file=sys.stderr)
+        client_cpus = client_cpus or available
+    os.sched_setaffinity(0, client_cpus)
+    args.server_cpus = sorted(server_cpus)  # the server would otherwise inherit the client's CPUs
+
+    results = {}
+    for players in args.players:
+        for mode in args.modes:
+            results[mode, players] = run(mode, players, args, args.port)
+
+    header = f"{'players':>8}" + ''.join(f" | {mode + ' p50':>12} {'p99':>8} {'req/s':>7} {'err':>5}" for mode in args.modes)
+    print(f"server cpus {sorted(server_cpus)}, client cpus {sorted(client_cpus)}, {1 / args.interval:g} polls/s per player, "
+          f"3 requests per poll, {args.streaming:.0%} of players streaming, latency in ms")
+    print(header)
+    for players in args.players:
+        row = f"{players:>8}"
+        for mode in args.modes:
+            r = results[mode, players]
+            row += f" | {r['p50']:>12.1f} {r['p99']:>8.1f} {r['rps']:>7.0f} {r['errors']:>5}"
+        print(row)
+
+if __name__ == '__main__':
+    main()
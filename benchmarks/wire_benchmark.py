@@ -0,0 +1,66 @@
+"""Compare /game/status payload encodings by size and encode time.
+
+Usage: python benchmarks/wire_benchmark.py [--entities N ...] [--since-ticks N]
+
+Builds a game with the given number of entities, runs a few ticks, then
+encodes the full to_dict() payload and a delta snapshot against an earlier
+tick, as JSON and in the binary wire format.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+os.environ.setdefault('ENVIRONMENT', 'local')
+os.environ.setdefault('GAME_TICK_RATE', '0')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+import app
+from engine_benchmark import populate
+
+logging.getLogger().setLevel(logging.WARNING)
+
+def timed(encode, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        payload = encode()
+    return payload, (time.perf_counter() - start) / repeat
+
+def encodings(state, since):
+    return {
+        'json full': lambda: json.dumps(state.to_dict()).encode(),
+        'json delta': lambda: json.dumps(state.snapshot(since, state.game_id)).encode(),
+        'binary full': lambda: app.encode_state(state.to_dict(), state.tick),
+        'binary delta': lambda: app.encode_state(state.snapshot(since, state.game_id))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entities', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--since-ticks', type=int, default=1,
+                        help='age of the delta baseline in ticks')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    app.MAX_ENEMIES = max(args.entities)
+
+    print(f"{'entities':>9} {'encoding':>12} {'bytes':>10} {'encode ms':>10} {'vs json':>8}")
+    for entities in args.entities:
+        state = populate(app.ArrayGameState(), entities, seed=1)
+        state.player_health = 100
+        np.random.seed(1)
+        for _ in range(args.since_ticks + 1):
+            state.shoot()
+            state.update()
+        since = state.tick - args.since_ticks
+        baseline = None
+        for name, encode in encodings(state, since).items():
+            payload, seconds = timed(encode, args.repeat)
+            baseline = baseline or len(payload)
+            print(f"{entities:>9} {name:>12} {len(payload):>10} {seconds * 1000:>10.3f} "
+                  f"{len(payload) / baseline:>7.1%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Extract the game page's inline CSS and JavaScript into fingerprinted bundles.
+
+Usage: python build_assets.py
+
+Writes assets/dist/game.<hash>.css, assets/dist/game.<hash>.js, an SVG sprite
+atlas assets/dist/sprites.<hash>.svg of every top-level assets/*.svg with its
+sprites.json manifest, the HTML shell that references them and a manifest.json
+recording which GAME_PAGE_HTML they were built from. CSS url() references to
+the individual SVGs are rewritten to views in the sprite. app.py serves the
+shell only while that source is unchanged, so editing the page without
+rebuilding falls back to the inline version.
+Prints raw, gzip and brotli byte counts before and after.
+"""
+import glob
+import gzip
+import hashlib
+import json
+import os
+import shutil
+
+from page_assets import GAME_PAGE_HTML, build_page_bundles, build_svg_sprite, minify_svg, page_source_digest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+BUILD_DIR = os.path.join(ASSET_DIR, 'dist')
+
+def sizes(data):
+    row = [len(data), len(gzip.compress(data, 9, mtime=0))]
+    row.append(len(brotli.compress(data, quality=11)) if brotli is not None else 0)
+    return row
+
+def load_svgs():
+    svgs = {}
+    for path in sorted(glob.glob(os.path.join(ASSET_DIR, '*.svg'))):
+        with open(path, encoding='utf-8') as f:
+            svgs[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    return svgs
+
+def main():
+    source = GAME_PAGE_HTML.encode('utf-8')
+    svgs = load_svgs()
+    sprite, entries = build_svg_sprite(svgs)
+    sprite_name = f"sprites.{hashlib.sha256(sprite).hexdigest()[:12]}.svg"
+    sprite_manifest = {
+        name: dict(entry, url=f"/assets/dist/{sprite_name}#{entry['view']}")
+        for name, entry in entries.items()
+    }
+    shell, files = build_page_bundles(
+        GAME_PAGE_HTML, {f"{name}.svg": entry['url'] for name, entry in sprite_manifest.items()})
+    files[sprite_name] = sprite
+    # Build into a fresh directory so old fingerprints don't accumulate
+    shutil.rmtree(BUILD_DIR, ignore_errors=True)
+    os.makedirs(BUILD_DIR)
+    for filename, data in files.items():
+        with open(os.path.join(BUILD_DIR, filename), 'wb') as f:
+            f.write(data)
+    with open(os.path.join(BUILD_DIR, 'index.html'), 'wb') as f:
+        f.write(shell)
+    with open(os.path.join(BUILD_DIR, 'sprites.json'), 'w') as f:
+        json.dump({'sprite': f"/assets/dist/{sprite_name}", 'images': sprite_manifest}, f, indent=2)
+    with open(os.path.join(BUILD_DIR, 'manifest.json'), 'w') as f:
+        json.dump({'source': page_source_digest(), 'page': 'index.html', 'sprite': sprite_name,
+                   'files': sorted(files)}, f, indent=2)
+
+    print(f"{'file':>28} {'bytes':>8} {'gzip':>8} {'brotli':>8}")
+    rows = [('inline page (before)', sizes(source)), ('html shell', sizes(shell))]
+    rows += [(filename, sizes(data)) for filename, data in sorted(files.items())]
+    for name, (raw, gz, br) in rows:
+        print(f"{name:>28} {raw:>8} {gz:>8} {br:>8}")
+    first_visit = [sum(column) for column in zip(*(row for _, row in rows[1:]))]
+    print(f"{'first visit (after)':>28} {first_visit[0]:>8} {first_visit[1]:>8} {first_visit[2]:>8}")
+    print(f"{'repeat visit (after)':>28} {rows[1][1][0]:>8} {rows[1][1][1]:>8} {rows[1][1][2]:>8}")
+
+    separate = [sum(column) for column in zip(*(sizes(minify_svg(text).encode('utf-8')) for text in svgs.values()))]
+    print(f"{f'{len(svgs)} svg requests (before)':>28} {separate[0]:>8} {separate[1]:>8} {separate[2]:>8}")
+    print(f"{'1 sprite request (after)':>28} {len(sprite):>8} {sizes(sprite)[1]:>8} {sizes(sprite)[2]:>8}")
+
+if __name__ == '__main__':
+    main()
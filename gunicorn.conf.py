@@ -0,0 +1,37 @@
+"""Gunicorn settings for the game server.
+
+Usage: gunicorn --config gunicorn.conf.py app:app
+
+WORKER_MODE selects how requests are served:
+
+- gevent (default): one cooperative worker. Every connection is a greenlet,
+  so WORKER_CONNECTIONS players can have requests, SSE streams and
+  WebSockets in flight at once.
+- gthread: a pool of THREADS OS threads per worker. At most
+  WEB_CONCURRENCY * THREADS requests run at once and the rest wait in the
+  accept queue. Streams and WebSockets each hold a thread for as long as
+  they are open.
+- sync: one request at a time per worker, for debugging.
+
+Game sessions live in the worker's memory, so WEB_CONCURRENCY should stay 1
+unless requests are routed to workers by session. SCORE_ID_WORKER identifies
+one process, so it cannot be combined with more than one worker.
+"""
+import os
+
+WORKER_MODES = ('gevent', 'gthread', 'sync')
+
+worker_mode = os.environ.get('WORKER_MODE', 'gevent').lower()
+if worker_mode not in WORKER_MODES:
+    raise ValueError(f"WORKER_MODE must be one of {', '.join(WORKER_MODES)}, not {worker_mode!r}")
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+worker_class = worker_mode
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+if workers > 1 and os.environ.get('SCORE_ID_WORKER'):
+    raise ValueError("SCORE_ID_WORKER names a single process; run WEB_CONCURRENCY=1 per worker id")
+threads = int(os.environ.get('THREADS', 8)) if worker_mode == 'gthread' else 1
+worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 2000))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+keepalive = int(os.environ.get('KEEPALIVE', 5))  # seconds; clients poll well inside this
+backlog = int(os.environ.get('BACKLOG', 2048))
@@ -7,6 +7,12 @@ echo "Starting Cloud Defender game locally..."
 # Set environment variable to indicate local mode
 export ENVIRONMENT=local
 
+# Keep scores across restarts in a local append-only log
+export SCORE_LOG_PATH=${SCORE_LOG_PATH:-data/scores.log}
+
+# Reload assets from disk when they change
+export ASSET_DEV_MODE=${ASSET_DEV_MODE:-true}
+
 # Check if Python is installed
 if ! command -v python3 &> /dev/null; then
     echo "Python 3 is not installed. Please install Python 3 to run this application."
@@ -20,6 +26,9 @@ python3 -m pip install -q flask numpy pygame pillow
 # Create assets directory if it doesn't exist
 mkdir -p assets
 
+# Build the fingerprinted page bundles (the inline page is served if this is skipped)
+python3 build_assets.py
+
 # Run the Flask application
 echo "Starting Flask application on http://localhost:8082"
 echo "Press Ctrl+C to stop the server"
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# The app reads its settings at import: run it in local mode, without the
+# tick thread, and keep the shared scores cache out of /dev/shm
+os.environ.setdefault('ENVIRONMENT', 'local')
+os.environ.setdefault('GAME_TICK_RATE', '0')
+os.environ.setdefault('SCORES_CACHE_PATH', os.path.join(tempfile.mkdtemp(), 'scores-cache'))
+os.environ.pop('SCORE_LOG_PATH', None)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
@@ -0,0 +1,57 @@
+import json
+
+import app
+
+
+def post_import(client, lines):
+    body = '\n'.join(line if isinstance(line, str) else json.dumps(line) for line in lines)
+    return client.post('/scores/import', data=body.encode(), content_type='application/x-ndjson')
+
+
+def test_import_skips_and_counts_invalid_lines():
+    client = app.app.test_client()
+    response = post_import(client, [
+        {'id': 'import-ok-1', 'player_name': 'ada', 'score': 120, 'timestamp': 1700000000},
+        '{"id": "import-ok-2", "score": 1e3}',
+        'not json',
+        '[1, 2, 3]',
+        {'id': 'import-bad-score', 'score': -5},
+        {'id': 'import-bad-level', 'score': 10, 'level': 'high'},
+        {'id': 'x' * 25, 'score': 10},
+        {'id': {'nested': True}, 'score': 10},
+        {'id': 'import-bad-name', 'score': 10, 'player_name': ''},
+        '',
+    ])
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert summary['imported'] == 2
+    assert summary['skipped'] == 7
+    assert summary['first_error'].startswith('line 3:')
+
+    exported = [json.loads(line) for line in client.get('/scores/export').data.decode().splitlines()]
+    by_id = {item['id']: item for item in exported}
+    assert by_id['import-ok-1']['score'] == 120
+    assert by_id['import-ok-1']['timestamp'] == 1700000000
+    assert by_id['import-ok-2']['score'] == 1000
+    assert not any(item['id'].startswith('import-bad') for item in exported)
+
+
+def test_export_round_trips_through_import():
+    client = app.app.test_client()
+    post_import(client, [{'id': f"round-trip-{i}", 'score': i, 'player_name': f"p{i}"} for i in range(5)])
+    exported = client.get('/scores/export').data.decode().splitlines()
+    response = post_import(client, exported)
+    assert response.get_json()['imported'] == len(exported)
+    assert response.get_json()['skipped'] == 0
+
+
+def test_reimport_does_not_duplicate_local_scores():
+    client = app.app.test_client()
+    lines = [{'id': f"reimport-{i}", 'score': 5000 + i} for i in range(3)]
+    post_import(client, lines)
+    post_import(client, lines)
+    exported = [json.loads(line)['id'] for line in client.get('/scores/export').data.decode().splitlines()]
+    assert sorted(score_id for score_id in exported if score_id.startswith('reimport-')) == \
+        ['reimport-0', 'reimport-1', 'reimport-2']
+    top = [item['id'] for item in app.memory_scores.top(app.memory_scores.top_k)]
+    assert len(top) == len(set(top))
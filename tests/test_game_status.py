@@ -0,0 +1,16 @@
+import app
+
+
+def test_finished_game_stays_frozen_and_keeps_its_etag():
+    client = app.app.test_client()
+    token = client.post('/game/start').headers['X-Game-Session']
+    headers = {'X-Game-Session': token}
+    game = app.game_registry.peek(token)
+    game.game_over = True
+
+    first = client.get('/game/status', headers=headers)
+    tick, enemies = game.tick, [list(enemy) for enemy in game.to_dict()['enemies']]
+    second = client.get('/game/status', headers=dict(headers, **{'If-None-Match': first.headers['ETag']}))
+    assert second.status_code == 304
+    assert game.tick == tick
+    assert game.to_dict()['enemies'] == enemies
@@ -0,0 +1,42 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client():
+    client = app.app.test_client()
+    response = client.post('/game/start')
+    assert response.status_code == 200
+    client.environ_base['HTTP_X_GAME_SESSION'] = response.headers['X-Game-Session']
+    return client
+
+
+def test_step_runs_the_requested_ticks(client):
+    response = client.post('/game/step', json={'ticks': 10, 'inputs': [{'tick': 2, 'action': 'shoot'}]})
+    assert response.status_code == 200
+    assert response.get_json()['events']['ticks'] == 10
+
+
+@pytest.mark.parametrize('body, error', [
+    ('not json', 'Body must be a JSON object'),
+    ([1, 2], 'Body must be a JSON object'),
+    ({'ticks': 'ten'}, 'ticks must be an integer'),
+    ({'ticks': True}, 'ticks must be an integer'),
+    ({'ticks': 0}, 'ticks must be an integer'),
+    ({'ticks': app.MAX_STEP_TICKS + 1}, 'ticks must be an integer'),
+    ({'inputs': {'tick': 0, 'action': 'shoot'}}, 'inputs must be a list'),
+    ({'inputs': ['shoot']}, 'Invalid input: each command must be an object'),
+    ({'inputs': [{'action': 'jump'}]}, 'Invalid input: action must be one of'),
+    ({'inputs': [{'tick': 'soon', 'action': 'left'}]}, 'Invalid input: tick must be a non-negative integer'),
+    ({'inputs': [{'tick': -1, 'action': 'left'}]}, 'Invalid input: tick must be a non-negative integer'),
+    ({'inputs': [{'tick': 1.5, 'action': 'left'}]}, 'Invalid input: tick must be a non-negative integer'),
+    ({'ticks': 5, 'inputs': [{'tick': 5, 'action': 'left'}]}, 'Invalid input: tick must be less than ticks'),
+])
+def test_step_rejects_malformed_requests(client, body, error):
+    if isinstance(body, str):
+        response = client.post('/game/step', data=body, content_type='application/json')
+    else:
+        response = client.post('/game/step', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith(error)
@@ -0,0 +1,64 @@
+import app
+
+
+def scores(*values):
+    return [app.build_score_item({'score': value, 'player_name': f"p{value}"}) for value in values]
+
+
+def test_replay_restores_appended_scores(tmp_path):
+    path = str(tmp_path / 'scores.log')
+    log = app.ScoreLog(path, app.MemoryScoreStore())
+    log.append(scores(10, 30, 20))
+    log.close()
+
+    store = app.MemoryScoreStore()
+    assert app.ScoreLog(path, store).replay() == 3
+    assert [item['score'] for item in store.top(10)] == [30, 20, 10]
+
+
+def test_torn_tail_is_truncated_before_appending(tmp_path):
+    path = str(tmp_path / 'scores.log')
+    log = app.ScoreLog(path, app.MemoryScoreStore())
+    log.append(scores(10, 20))
+    log.close()
+    # A crash part way through an append leaves a partial record at the end
+    with open(path, 'ab') as f:
+        f.write(app.ScoreLog.encode(scores(99))[:50])
+
+    store = app.MemoryScoreStore()
+    log = app.ScoreLog(path, store)
+    expected = app.SCORE_LOG_HEADER.size + 2 * app.SCORE_LOG_RECORD.itemsize
+    assert (tmp_path / 'scores.log').stat().st_size == expected
+    assert log.replay() == 2
+    log.append(scores(40))
+    log.close()
+
+    store = app.MemoryScoreStore()
+    assert app.ScoreLog(path, store).replay() == 3
+    assert [item['score'] for item in store.top(10)] == [40, 20, 10]
+
+
+def test_torn_header_starts_a_new_log(tmp_path):
+    path = tmp_path / 'scores.log'
+    path.write_bytes(app.SCORE_LOG_MAGIC)
+    log = app.ScoreLog(str(path), app.MemoryScoreStore())
+    assert log.replay() == 0
+    log.append(scores(5))
+    log.close()
+    assert app.ScoreLog(str(path), app.MemoryScoreStore()).replay() == 1
+
+
+def test_replay_and_export_keep_one_record_per_id(tmp_path):
+    path = str(tmp_path / 'scores.log')
+    items = scores(10, 20)
+    log = app.ScoreLog(path, app.MemoryScoreStore())
+    log.append(items)
+    log.append(items)
+    assert [item['id'] for item in log.iter_items()] == [item['id'] for item in items]
+    log.close()
+
+    store = app.MemoryScoreStore()
+    app.ScoreLog(path, store).replay()
+    assert len(store) == 2
+    assert store.extend(items) == []
+    assert store.duplicates == 2
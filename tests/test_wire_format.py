@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+import app
+
+
+@pytest.fixture(params=sorted(app.GAME_ENGINES))
+def game(request):
+    # Enemy spawns draw from np.random: seed it, and place enemies away from
+    # the player's line of fire so the round trips always carry some
+    np.random.seed(7)
+    game = app.GAME_ENGINES[request.param]()
+    game.add_enemy(60, 20, 'ec2')
+    game.add_enemy(app.SCREEN_WIDTH - 60, 40, 'lambda')
+    game.step(40, [{'tick': tick, 'action': 'shoot'} for tick in range(0, 40, 4)])
+    return game
+
+
+def round_trip(payload):
+    return app.decode_state(app.encode_state(payload, tick=payload.get('tick', 0)))
+
+
+def test_full_state_round_trip(game):
+    payload = dict(game.to_dict(), tick=game.tick)
+    assert payload['bullets'] and payload['enemies']
+    assert round_trip(payload) == payload
+
+
+def test_keyframe_round_trip(game):
+    payload = game.snapshot()
+    assert payload['keyframe']
+    assert round_trip(payload) == payload
+
+
+def test_delta_round_trip(game):
+    since = game.tick
+    game.step(20, [{'tick': 0, 'action': 'shoot'}, {'tick': 5, 'action': 'left'}])
+    payload = game.snapshot(since=since, game_id=game.game_id)
+    assert not payload['keyframe']
+    assert round_trip(payload) == payload
+
+
+def test_decode_rejects_other_payloads():
+    with pytest.raises(ValueError):
+        app.decode_state(b'XX' + bytes(app.WIRE_HEADER.size - 2))